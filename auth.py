@@ -1,6 +1,30 @@
-from playwright.sync_api import sync_playwright
+import os
+import re
 import time
-from .config import USERNAME, PASSWORD, LOGIN_URL, HEADLESS
+from .config import USERNAME, PASSWORD, LOGIN_URL, HEADLESS, AUTH_STATE_FILE, LOGS_DIR, PERSONAL_INFO, ensure_dirs
+from .resource_filter import resource_filter
+from .tracing import span
+
+# What a logged-in portal page shows: a logout link, or a greeting / the user's name
+# (these two only count when the page has no login link, "Welcome" may greet anyone)
+LOGOUT_MARKERS = ("Logout", "Log Out")
+GREETING_MARKERS = ("Welcome",) + tuple(PERSONAL_INFO["first_name"].split()[:1])
+LOGIN_FORM_MARKERS = ("user_username", "user[username]")
+LOGIN_LINK_RE = re.compile(r">\s*Log ?in\s*<", re.I)
+
+
+def is_logged_in(html):
+    """
+    Whether a portal page (its HTML) belongs to a logged-in session. The one
+    check behind both login() and session_is_valid(), so a session saved
+    after login is also accepted when it is reused.
+    """
+    if any(marker in html for marker in LOGIN_FORM_MARKERS):
+        return False
+    if any(marker in html for marker in LOGOUT_MARKERS):
+        return True
+    return any(marker in html for marker in GREETING_MARKERS) and not LOGIN_LINK_RE.search(html)
+
 
 def login(page):
     print(f"Navigating to {LOGIN_URL}...")
@@ -13,7 +37,7 @@ def login(page):
     
     try:
         # Check if we are already logged in (look for logout button or user profile)
-        if page.is_visible("text=Logout") or page.is_visible("text=Welcome"):
+        if is_logged_in(page.content()):
             print("Already logged in.")
             return True
 
@@ -21,7 +45,8 @@ def login(page):
         # Common selectors for UB Jobs: 'a[href*="login"]', 'text=Login'
         if page.is_visible("text=Login"):
             page.click("text=Login")
-            page.wait_for_load_state("networkidle")
+            with span("login.networkidle", step="login_link"):
+                page.wait_for_load_state("networkidle")
 
         # Fill credentials
         # Selectors need to be robust. Assuming standard input fields.
@@ -35,10 +60,11 @@ def login(page):
         page.click("button[type='submit'], input[type='submit']")
         
         # Wait for navigation
-        page.wait_for_load_state("networkidle")
+        with span("login.networkidle", step="submit"):
+            page.wait_for_load_state("networkidle")
         
         # Verify login
-        if page.is_visible("text=Logout") or page.is_visible("text=Welcome") or page.is_visible("text=Prabhu"):
+        if is_logged_in(page.content()):
             print("Login successful!")
             return True
         else:
@@ -47,5 +73,57 @@ def login(page):
             
     except Exception as e:
         print(f"Login failed with error: {e}")
-        page.screenshot(path="logs/login_error.png")
+        page.screenshot(path=os.path.join(LOGS_DIR, "login_error.png"))
+        return False
+
+
+def saved_state():
+    """Path of the saved login state, or None if there is none yet."""
+    return AUTH_STATE_FILE if os.path.exists(AUTH_STATE_FILE) else None
+
+
+def save_session(context):
+    ensure_dirs()
+    context.storage_state(path=AUTH_STATE_FILE)
+    # Session cookies are as good as the password
+    os.chmod(AUTH_STATE_FILE, 0o600)
+
+
+def session_is_valid(context):
+    # Cheap probe: one HTTP request with the context's cookies, no page render
+    try:
+        resp = context.request.get(LOGIN_URL, timeout=15000)
+        body = resp.text()
+    except Exception as e:
+        print(f"Session probe failed: {e}")
         return False
+    return is_logged_in(body)
+
+
+def open_session(browser):
+    """
+    Returns a logged-in (context, page), or (None, None) if login failed.
+
+    The saved state from the last successful login is tried first; a full
+    login only happens when there is none or the portal no longer accepts it.
+    Worker contexts can be started from the same file (see saved_state).
+    Requests are filtered from the start, login pages with the "login" phase.
+    """
+    state = saved_state()
+    if state:
+        context = browser.new_context(storage_state=state)
+        resource_filter.install(context, phase="login")
+        if session_is_valid(context):
+            print("Reusing saved session.")
+            return context, context.new_page()
+        print("Saved session expired, logging in again...")
+        context.close()
+
+    context = browser.new_context()
+    resource_filter.install(context, phase="login")
+    page = context.new_page()
+    if not login(page):
+        context.close()
+        return None, None
+    save_session(context)
+    return context, page
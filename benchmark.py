@@ -0,0 +1,200 @@
+"""
+Offline end-to-end benchmark: runs main.main against the mock portal and the
+stub LLM, and reports jobs per minute and per-phase latency percentiles.
+
+    python -m UBJob_Application_Agent.benchmark                      # 10, 100 and 1000 postings
+    python -m UBJob_Application_Agent.benchmark --sizes 10 --llm-latency 2
+    python -m UBJob_Application_Agent.benchmark --output before.json
+    python -m UBJob_Application_Agent.benchmark --baseline before.json
+    python -m UBJob_Application_Agent.benchmark --imports --import-budget-ms 600
+
+Every run gets a scratch data folder, so nothing in logs/ or generated_docs/
+is read or touched. The browser runs headless. Phase timings come from the
+agent's own tracing spans (see tracing.py).
+
+--imports measures cold start instead: each CLI command in a fresh
+interpreter, and which heavy dependencies it loads.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from .mock_portal import start_portal
+from .stub_llm import start_stub_server
+from .tracing import read_spans, summary_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = __package__ or os.path.basename(BASE_DIR)
+DEFAULT_SIZES = [10, 100, 1000]
+
+# Cold-start cases: interpreter arguments ({data} is a scratch folder)
+IMPORT_CASES = {
+    "python": ["-c", "pass"],
+    "import main": ["-c", f"import {PACKAGE}.main"],
+    "status": ["-m", f"{PACKAGE}.main", "status"],
+    "export-log": ["-m", f"{PACKAGE}.main", "export-log", "{data}/export.csv"],
+    # Everything a discovery-only scan imports before the browser starts
+    "discovery": ["-c", f"import {PACKAGE}.main, {PACKAGE}.auth, {PACKAGE}.scraper, {PACKAGE}.matcher, "
+                        f"{PACKAGE}.pipeline, {PACKAGE}.workers, {PACKAGE}.posting_cache"],
+}
+HEAVY_MODULES = ["playwright", "openai", "docx", "numpy", "requests", "bs4", "pypdf"]
+
+
+def run_once(postings, llm_latency=1.0, llm_jitter=0.0, portal_latency=0.0, per_page=100, keep=False):
+    """
+    One end-to-end run of main.main in a fresh interpreter.
+    Returns {"postings", "jobs", "applied", "seconds", "jobs_per_minute", "phases": {span name: [seconds]}, "requests"}.
+    """
+    data_dir = tempfile.mkdtemp(prefix="ub_bench_")
+    portal, portal_url = start_portal(postings, per_page=per_page, latency=portal_latency)
+    llm, llm_url = start_stub_server(llm_latency, llm_jitter)
+    trace_file = os.path.join(data_dir, "trace.jsonl")
+
+    env = dict(os.environ)
+    env.update({
+        "UB_LOGIN_URL": f"{portal_url}/",
+        "UB_SEARCH_URL": f"{portal_url}/postings/search",
+        "UB_DATA_DIR": data_dir,
+        "UB_HEADLESS": "1",
+        "UB_USERNAME": "bench",
+        "UB_PASSWORD": "bench",
+        "OPENAI_BASE_URL": llm_url,
+        "OPENAI_API_KEY": "stub",
+        "UB_TRACE_FILE": trace_file,
+    })
+    try:
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", f"{PACKAGE}.main", "run"],
+            cwd=os.path.dirname(BASE_DIR), env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        seconds = time.perf_counter() - started
+        if proc.returncode != 0 or not os.path.exists(trace_file):
+            raise RuntimeError(f"Benchmark run failed (exit {proc.returncode}):\n{proc.stdout[-3000:]}")
+        phases = {}
+        scraped = set()
+        for s in read_spans(trace_file):
+            phases.setdefault(s["name"], []).append(s["duration"])
+            if s["name"] == "detail":
+                scraped.add(s["attrs"].get("job_id"))
+    finally:
+        portal.shutdown()
+        llm.shutdown()
+        if keep:
+            print(f"Kept run data in {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    # Every scraped posting counts, including near-duplicates that skip matching
+    jobs = len(scraped)
+    return {
+        "postings": postings,
+        "jobs": jobs,
+        "applied": len(phases.get("apply", [])),
+        "seconds": seconds,
+        "jobs_per_minute": jobs / seconds * 60 if seconds else 0.0,
+        "phases": phases,
+        "requests": dict(portal.RequestHandlerClass.counts),
+    }
+
+
+def print_result(result, baseline=None):
+    print(f"\n=== {result['postings']} postings: {result['jobs']} jobs, {result['applied']} applications "
+          f"in {result['seconds']:.1f}s -> {result['jobs_per_minute']:.1f} jobs/min")
+    if baseline:
+        before = baseline["jobs_per_minute"]
+        change = (result["jobs_per_minute"] / before - 1) * 100 if before else 0.0
+        print(f"    baseline {before:.1f} jobs/min ({change:+.0f}%)")
+    print(summary_table(result["phases"]))
+    requests = ", ".join(f"{k}: {v}" for k, v in sorted(result["requests"].items()))
+    print(f"Portal requests: {requests}")
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, baseline=None, **options):
+    baseline_by_size = {r["postings"]: r for r in (baseline or [])}
+    results = []
+    for size in sizes:
+        print(f"Running benchmark with {size} postings...")
+        result = run_once(size, **options)
+        print_result(result, baseline_by_size.get(size))
+        results.append(result)
+    return results
+
+
+def import_benchmark(repeat=5, budget_ms=None):
+    """
+    Times each IMPORT_CASES command in fresh interpreters and lists the heavy
+    modules it loads. Returns ({case: median ms}, ok), ok being False when a
+    command other than bare python is over budget_ms.
+    """
+    data_dir = tempfile.mkdtemp(prefix="ub_bench_")
+    env = dict(os.environ, UB_DATA_DIR=data_dir)
+    cwd = os.path.dirname(BASE_DIR)
+    results = {}
+    try:
+        print(f"{'command':<14}{'min ms':>9}{'median ms':>11}  heavy modules loaded")
+        for case, args in IMPORT_CASES.items():
+            args = [a.replace("{data}", data_dir) for a in args]
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                times.append((time.perf_counter() - started) * 1000)
+            # One more run with -X importtime to see what got pulled in
+            trace = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+            loaded = {line.rsplit("|", 1)[-1].strip() for line in trace.splitlines() if "|" in line}
+            heavy = [m for m in HEAVY_MODULES if m in loaded]
+            times.sort()
+            results[case] = times[len(times) // 2]
+            print(f"{case:<14}{times[0]:>9.0f}{results[case]:>11.0f}  {', '.join(heavy) or '-'}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if budget_ms is None:
+        return results, True
+    over = [case for case, ms in results.items() if case != "python" and ms > budget_ms]
+    if over:
+        print(f"Over the {budget_ms:g} ms budget: {', '.join(over)}")
+    return results, not over
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against a mock portal and stub LLM")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of postings to run with")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Seconds per stub LLM response")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="Extra random seconds per LLM response")
+    parser.add_argument("--portal-latency", type=float, default=0.0, help="Seconds added to every portal page")
+    parser.add_argument("--per-page", type=int, default=100, help="Postings per search results page")
+    parser.add_argument("--output", help="Save the results as JSON")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    parser.add_argument("--keep", action="store_true", help="Keep each run's data folder")
+    parser.add_argument("--imports", action="store_true", help="Measure CLI cold start instead")
+    parser.add_argument("--import-budget-ms", type=float, help="With --imports, exit 1 if a command is slower")
+    args = parser.parse_args()
+
+    if args.imports:
+        _, ok = import_benchmark(budget_ms=args.import_budget_ms)
+        sys.exit(0 if ok else 1)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_benchmark(
+        args.sizes, baseline,
+        llm_latency=args.llm_latency, llm_jitter=args.llm_jitter,
+        portal_latency=args.portal_latency, per_page=args.per_page, keep=args.keep,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
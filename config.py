@@ -1,23 +1,41 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The .env next to the code is read by path; without one, python-dotenv searches
+# upward from the working directory (a .env in the run folder or the repo root)
+ENV_FILE = os.path.join(BASE_DIR, ".env")
+if os.path.exists(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
+else:
+    from dotenv import find_dotenv, load_dotenv
+    load_dotenv(find_dotenv(usecwd=True))
 
 USERNAME = os.getenv("UB_USERNAME", "")
 PASSWORD = os.getenv("UB_PASSWORD", "")
 LOGIN_URL = os.getenv("UB_LOGIN_URL", "https://www.ubjobs.buffalo.edu/")
+SEARCH_URL = os.getenv("UB_SEARCH_URL", "https://www.ubjobs.buffalo.edu/postings/search")
 
 if not USERNAME or not PASSWORD:
     print("WARNING: UB_USERNAME or UB_PASSWORD not set in .env")
     
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-LOGS_DIR = os.path.join(BASE_DIR, "logs")
+# Where logs and generated letters go; the benchmark points this at a scratch folder
+DATA_DIR = os.getenv("UB_DATA_DIR", BASE_DIR)
+LOGS_DIR = os.path.join(DATA_DIR, "logs")
 RESUMES_DIR = os.path.join(BASE_DIR, "resumes")
-GENERATED_DOCS_DIR = os.path.join(BASE_DIR, "generated_docs")
+GENERATED_DOCS_DIR = os.path.join(DATA_DIR, "generated_docs")
+
+_dirs_ready = False
 
-os.makedirs(LOGS_DIR, exist_ok=True)
-os.makedirs(RESUMES_DIR, exist_ok=True)
-os.makedirs(GENERATED_DOCS_DIR, exist_ok=True)
+
+def ensure_dirs():
+    """Creates the logs, resumes and generated_docs folders (once per process), before anything is written."""
+    global _dirs_ready
+    if not _dirs_ready:
+        for path in (LOGS_DIR, RESUMES_DIR, GENERATED_DOCS_DIR):
+            os.makedirs(path, exist_ok=True)
+        _dirs_ready = True
 
 PERSONAL_INFO = {
     "first_name": "Prabhu Kiran",
@@ -197,5 +215,97 @@ RESUME_PATHS = {
     "ASSOCIATE": os.path.join(RESUMES_DIR, "Resume_Associate.pdf")
 }
 
-HEADLESS = False # Set to True for Dry Run in production, I kept it False for now to see the browser actions
+# Browser cookies/storage from the last successful login, reused until the session expires
+AUTH_STATE_FILE = os.path.join(LOGS_DIR, "auth_state.json")
+
+# Selectors that worked on each application form layout, learned as the agent applies
+FORM_LAYOUTS_FILE = os.path.join(LOGS_DIR, "form_layouts.json")
+
+# Cached resume text vectors, rebuilt when a resume file changes
+RESUME_VECTORS_FILE = os.path.join(LOGS_DIR, "resume_vectors.npz")
+
+# How a job is routed to a resume:
+# "keywords" - KEYWORDS lists only, "resume" - similarity to the resume PDFs,
+# "hybrid"   - keywords, with resume similarity instead of the default when no keyword matches
+MATCH_MODE = "hybrid"
+
+HEADLESS = os.getenv("UB_HEADLESS", "").lower() in ("1", "true", "yes") # Set to True for Dry Run in production, I kept it False for now to see the browser actions
 CHECK_FREQUENCY_HOURS = 24
+
+# Daemon mode (python -m UBJob_Application_Agent.main daemon): one browser and login kept between scans.
+# Each wait is CHECK_FREQUENCY_HOURS +/- this fraction, so scans don't hit the portal at fixed times
+DAEMON_JITTER = 0.1
+# Restart the browser when the agent and its browser processes use more than this (needs psutil)
+DAEMON_MAX_MEMORY_MB = 1500
+# Without psutil, restart the browser after this many scans instead
+DAEMON_RECYCLE_AFTER_SCANS = 10
+# Wait before trying again after a failed login or scan
+DAEMON_RETRY_MINUTES = 15
+
+# Number of posting detail pages scraped in parallel (1 = one page, one posting at a time)
+SCRAPE_CONCURRENCY = 4
+
+# "http" fetches posting pages with plain HTTP requests (browser only as a fallback), "browser" always uses Chromium
+SCRAPE_BACKEND = "http"
+HTTP_TIMEOUT_SECONDS = 20
+
+# Safety cap on how many search results pages one scan walks through
+MAX_SEARCH_PAGES = 20
+
+# Scraped postings are cached on disk; unchanged pages skip extraction, matching and generation
+POSTING_CACHE_FILE = os.path.join(LOGS_DIR, "posting_cache.json")
+POSTING_CACHE_TTL_HOURS = 24 * 7
+POSTING_CACHE_MAX_ENTRIES = 5000
+
+# Every extracted posting is also kept for good in a compressed, append-only archive (plus an
+# index next to it), for re-running matching or letters offline; empty = off
+ARCHIVE_FILE = os.path.join(LOGS_DIR, "postings.archive")
+# zlib level for archived records (1 = fastest, 9 = smallest)
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+# Near-duplicate postings (reposts under a new Job_ID): estimated Jaccard similarity of the
+# descriptions' word shingles above which a new posting counts as a copy of an earlier one
+NEAR_DUPLICATE_THRESHOLD = 0.9
+# "reuse" takes the earlier posting's resume match (the cover letter is still written for this
+# posting), "skip" logs it as Duplicate and stops there, "flag" only notes it, "off" disables the check
+NEAR_DUPLICATE_ACTION = "reuse"
+# MinHash signature length and LSH bands (must divide it); 128/16 finds pairs above ~0.9 almost surely
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16
+# Words per shingle
+SHINGLE_WORDS = 5
+
+# Job status changes are buffered and written to the job store this many at a time
+# (application results are written as soon as each application finishes)
+STATUS_FLUSH_BATCH = 20
+
+# Write timed spans for every phase and job here (JSON lines, plus a Chrome trace next to it); empty = off
+TRACE_FILE = os.getenv("UB_TRACE_FILE", "")
+
+# Jobs allowed to wait between two pipeline stages (discover -> classify -> generate -> apply)
+PIPELINE_QUEUE_SIZE = 8
+
+# Browser workers applying in parallel, each in its own context with the saved login (1 = apply in the main browser)
+APPLY_CONCURRENCY = 2
+
+# Any single page action or navigation during an application fails after this long, freeing its worker
+APPLY_TIMEOUT_SECONDS = 60
+# How long a form section (often loaded over AJAX or in a modal) may take to show its first field
+FORM_SECTION_TIMEOUT_SECONDS = 10
+
+# Requests the browser aborts, by profile. Entries are Playwright resource types,
+# plus "third-party" for anything not served by the portal (or RESOURCE_ALLOWED_HOSTS)
+RESOURCE_PROFILES = {
+    "full": [],
+    "lean": ["image", "media", "font", "third-party"],
+    "minimal": ["image", "media", "font", "stylesheet", "third-party"],
+}
+RESOURCE_PROFILE = "minimal"
+RESOURCE_ALLOWED_HOSTS = []
+
+# Per-phase exceptions for pages that break without them: resource types or hosts ("*" = any host).
+# Phases: "login", "search", "detail", "apply"
+RESOURCE_PHASE_ALLOW = {
+    "login": ["stylesheet", "*"],  # SSO pages may use other hosts; visibility checks need CSS
+    "apply": ["stylesheet"],       # hidden form sections must stay hidden
+}
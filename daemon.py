@@ -0,0 +1,160 @@
+"""
+Resident scheduler: keeps one browser and logged-in context alive and runs an
+incremental scan every CHECK_FREQUENCY_HOURS (with jitter), so each scan
+skips interpreter start-up, imports, the Chromium launch and the login.
+
+    python -m UBJob_Application_Agent.main daemon
+    python -m UBJob_Application_Agent.main daemon --interval-hours 0.5
+
+Ctrl+C / SIGTERM stop it after the current scan (a second Ctrl+C stops at once).
+"""
+import random
+import signal
+import threading
+import time
+from playwright.sync_api import sync_playwright
+from .config import (
+    HEADLESS, CHECK_FREQUENCY_HOURS, DAEMON_JITTER, DAEMON_MAX_MEMORY_MB,
+    DAEMON_RECYCLE_AFTER_SCANS, DAEMON_RETRY_MINUTES,
+)
+from .auth import open_session, session_is_valid
+from .main import check_required_data, scan
+from . import tracing
+from .tracing import span
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def memory_mb():
+    """Resident memory of this process and its children (Playwright driver, Chromium), or None without psutil."""
+    if psutil is None:
+        return None
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            # Renderer exited while we were looking
+            pass
+    return total / (1024 * 1024)
+
+
+def next_delay(interval_hours, jitter=DAEMON_JITTER):
+    """Seconds until the next scan: the interval, give or take the jitter fraction."""
+    return interval_hours * 3600 * random.uniform(1 - jitter, 1 + jitter)
+
+
+class Daemon:
+    def __init__(self, interval_hours=CHECK_FREQUENCY_HOURS, jitter=DAEMON_JITTER,
+                 max_memory_mb=DAEMON_MAX_MEMORY_MB, recycle_after_scans=DAEMON_RECYCLE_AFTER_SCANS,
+                 retry_minutes=DAEMON_RETRY_MINUTES):
+        self.interval_hours = interval_hours
+        self.jitter = jitter
+        self.max_memory_mb = max_memory_mb
+        self.recycle_after_scans = recycle_after_scans
+        self.retry_seconds = retry_minutes * 60
+        self.stop = threading.Event()
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.scans_on_browser = 0
+
+    def run(self):
+        print(f"Daemon started: scanning every {self.interval_hours:g}h (+/- {self.jitter:.0%}).")
+        if psutil is None:
+            print(f"psutil not installed: browser restarts every {self.recycle_after_scans} scans "
+                  "instead of on a memory ceiling.")
+        check_required_data()
+        self._handle_signals()
+
+        with sync_playwright() as p:
+            try:
+                while not self.stop.is_set():
+                    delay = self._scan_once(p)
+                    # Spans are written out per scan rather than kept for the daemon's lifetime
+                    summary = tracing.rotate()
+                    if summary:
+                        print(f"\n{summary}")
+                    if self.stop.is_set():
+                        break
+                    print(f"Next scan at {time.strftime('%Y-%m-%d %H:%M', time.localtime(time.time() + delay))}.")
+                    self.stop.wait(delay)
+            finally:
+                self._close_browser()
+        print("Daemon stopped.")
+
+    def _scan_once(self, p):
+        """Runs one scan; returns the seconds to wait before the next one."""
+        try:
+            if not self._ensure_session(p):
+                print(f"Login failed, retrying in {self.retry_seconds / 60:g} minutes.")
+                return self.retry_seconds
+            with span("scan", scan=self.scans_on_browser + 1):
+                scan(self.context, self.page)
+        except Exception as e:
+            # Start from a fresh browser next time, whatever broke
+            print(f"Scan failed: {e}")
+            self._close_browser()
+            return self.retry_seconds
+
+        self.scans_on_browser += 1
+        if self._should_recycle():
+            self._close_browser()
+        return next_delay(self.interval_hours, self.jitter)
+
+    def _ensure_session(self, p):
+        if self.browser is None or not self.browser.is_connected():
+            # Playwright would close the browser on the first Ctrl+C / SIGTERM; _handle_signals decides instead
+            self.browser = p.chromium.launch(headless=HEADLESS, handle_sigint=False,
+                                             handle_sigterm=False, handle_sighup=False)
+            self.context = self.page = None
+            self.scans_on_browser = 0
+
+        # One cheap HTTP probe per scan; a full login only when the portal dropped the session
+        if self.context is not None:
+            if session_is_valid(self.context):
+                return True
+            print("Session dropped, logging in again...")
+            self.context.close()
+
+        with span("login"):
+            self.context, self.page = open_session(self.browser)
+        return self.page is not None
+
+    def _should_recycle(self):
+        used = memory_mb()
+        if used is not None:
+            if used > self.max_memory_mb:
+                print(f"Memory at {used:.0f} MB (ceiling {self.max_memory_mb} MB), restarting the browser.")
+                return True
+            return False
+        if self.scans_on_browser >= self.recycle_after_scans:
+            print(f"{self.scans_on_browser} scans on this browser, restarting it.")
+            return True
+        return False
+
+    def _close_browser(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as e:
+                print(f"Warning: Could not close the browser cleanly: {e}")
+        self.browser = self.context = self.page = None
+
+    def _handle_signals(self):
+        def on_signal(signum, frame):
+            print(f"\nReceived {signal.Signals(signum).name}, stopping after the current scan...")
+            self.stop.set()
+            # A second signal stops right away
+            signal.signal(signum, signal.default_int_handler if signum == signal.SIGINT else signal.SIG_DFL)
+
+        signal.signal(signal.SIGINT, on_signal)
+        signal.signal(signal.SIGTERM, on_signal)
+
+
+def run_daemon(interval_hours=CHECK_FREQUENCY_HOURS):
+    Daemon(interval_hours).run()
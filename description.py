@@ -0,0 +1,100 @@
+import re
+
+# Headings PeopleAdmin uses for the actual posting content
+SECTION_HEADERS = (
+    "Position Title", "Posting Number", "Department", "Position Summary", "Position Description",
+    "Job Description", "About the Position", "Duties", "Responsibilities", "Essential Functions",
+    "Minimum Qualifications", "Preferred Qualifications", "Qualifications", "Salary Range",
+    "Special Instructions",
+)
+
+# Everything from these on is application machinery or site footer
+END_MARKERS = (
+    "Supplemental Questions", "Documents Needed To Apply", "Required Documents",
+    "Required fields are indicated", "Powered by PeopleAdmin",
+)
+
+# Site copyright notice ("© 2025 University at Buffalo", "Copyright (c) 2025 ..."). Only
+# a whole line among the last FOOTER_LINES counts, so postings that mention copyright
+# in their text (IP, legal or library jobs) are not cut short
+COPYRIGHT_RE = re.compile(r"(?:copyright|©)\s*(?:©|\(c\))?\s*(?:\d{4}\s*[-–]\s*)?\d{4}\b.{0,150}", re.I)
+FOOTER_LINES = 8
+
+# Navigation, buttons and sidebar links repeated on every portal page
+NAV_LINES = {
+    "home", "search jobs", "log in /create account", "log in", "login", "logout", "log out",
+    "my profile", "my applications", "my job alerts", "help", "bookmark", "bookmark this posting",
+    "apply for this job", "apply to this job", "view details", "print preview", "back to search",
+    "search results", "skip to main content", "toggle navigation", "menu", "close", "print",
+    "share", "email this posting", "job alerts", "create a job alert",
+}
+
+# Standard UB statements appended to every posting. Only the sentences that match are
+# dropped, not the paragraph around them; "with or without reasonable accommodation"
+# is how duties are worded, not a statement
+BOILERPLATE_RE = re.compile(
+    r"equal opportunity|affirmative action|(?<!without )reasonable accommodation|e-verify|"
+    r"clery act|annual security report|drug[- ]free workplace",
+    re.I,
+)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+CHARS_PER_TOKEN = 4
+
+
+def clean_description(raw):
+    """
+    Reduces the text of a posting page to the posting itself: starts at the
+    first content heading, stops at the application/footer section, and
+    drops navigation lines, repeated paragraphs and the standard EEO sentences.
+    """
+    lines = [line.strip() for line in (raw or "").splitlines()]
+    lines = [line for line in lines if line]
+
+    start = next(
+        (i for i, line in enumerate(lines) if line.lower().startswith(tuple(h.lower() for h in SECTION_HEADERS))),
+        0,
+    )
+    end = next(
+        (i for i in range(start + 1, len(lines)) if lines[i].startswith(END_MARKERS)),
+        len(lines),
+    )
+    end = next(
+        (i for i in range(max(start + 1, len(lines) - FOOTER_LINES), end) if COPYRIGHT_RE.fullmatch(lines[i])),
+        end,
+    )
+
+    kept = []
+    seen = set()
+    for line in lines[start:end]:
+        if line.lower() in NAV_LINES:
+            continue
+        if BOILERPLATE_RE.search(line):
+            line = " ".join(part for part in SENTENCE_RE.split(line) if not BOILERPLATE_RE.search(part))
+            if not line:
+                continue
+        key = line.lower()
+        # Repeated sentences are boilerplate; short repeated values ("Yes", "Full-time") are not
+        if len(line) > 40:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text; close enough for budgeting
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts text to about max_tokens, at a line break when there is one nearby."""
+    text = text or ""
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut].rstrip()
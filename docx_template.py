@@ -0,0 +1,205 @@
+import io
+import os
+import re
+import threading
+import zipfile
+from typing import TYPE_CHECKING, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+# python-docx is only needed to compile a template, so it is imported then
+if TYPE_CHECKING:
+    from docx.document import Document
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z_]+)\}\}")
+PARAGRAPH_RE = re.compile(r"<w:p[ >].*?</w:p>|<w:p/>", re.S)
+TEXT_RE = re.compile(r"<w:t(?: [^>]*)?>(.*?)</w:t>", re.S)
+PPR_RE = re.compile(r"<w:pPr>.*?</w:pPr>", re.S)
+RPR_RE = re.compile(r"<w:rPr>.*?</w:rPr>", re.S)
+DOCUMENT_XML = "word/document.xml"
+
+
+class CompiledTemplate:
+    """
+    A cover-letter template parsed once and rendered many times.
+
+    Compiling opens the DOCX, applies the Times New Roman 12pt styling and
+    records where every {{PLACEHOLDER}} sits in word/document.xml. Rendering
+    only joins the recorded XML pieces with the escaped values and writes a
+    copy of the in-memory package, without python-docx.
+
+    A paragraph that holds nothing but one placeholder is a block slot: its
+    value becomes one paragraph per line ("- " lines become bullets), and an
+    empty value removes the paragraph. Other placeholders are replaced inline.
+    """
+
+    def __init__(self, doc: "Document"):
+        from docx.shared import Pt
+
+        _merge_split_placeholders(doc)
+        for style in doc.styles:
+            if style.type == 1:
+                try:
+                    style.font.name = "Times New Roman"
+                    style.font.size = Pt(12)
+                except Exception:
+                    pass
+        try:
+            bullet_style = doc.styles["List Bullet"].style_id
+        except KeyError:
+            bullet_style = None
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        with zipfile.ZipFile(buffer) as package:
+            self._parts = {info: package.read(info.filename) for info in package.infolist()}
+        document_info = next(info for info in self._parts if info.filename == DOCUMENT_XML)
+        self._document_info = document_info
+
+        xml = self._parts.pop(document_info).decode("utf-8")
+        # Filled-in values may start or end with spaces
+        xml = xml.replace("<w:t>", '<w:t xml:space="preserve">')
+        self._bullet_style = bullet_style
+        self._segments = self._compile(xml)
+
+    @property
+    def placeholders(self) -> set:
+        return {seg[1] for seg in self._segments if not isinstance(seg, str)}
+
+    def _compile(self, xml: str) -> List:
+        # Segments: literal XML strings, ("inline", KEY) or ("block", KEY, pPr, rPr)
+        segments = []
+        pos = 0
+        for match in PARAGRAPH_RE.finditer(xml):
+            paragraph = match.group(0)
+            text = "".join(TEXT_RE.findall(paragraph)).strip()
+            block = PLACEHOLDER_RE.fullmatch(text)
+            if block:
+                segments.extend(_split_inline(xml[pos:match.start()]))
+                ppr = PPR_RE.search(paragraph)
+                rpr = RPR_RE.search(paragraph)
+                segments.append(("block", block.group(1),
+                                 ppr.group(0) if ppr else "", rpr.group(0) if rpr else ""))
+                pos = match.end()
+        segments.extend(_split_inline(xml[pos:]))
+        return segments
+
+    def render(self, values: Dict[str, str], path: str):
+        """Writes the filled-in document to path. Unknown placeholders render empty."""
+        parts = []
+        for seg in self._segments:
+            if isinstance(seg, str):
+                parts.append(seg)
+            elif seg[0] == "inline":
+                parts.append(_inline_xml(values.get(seg[1], "")))
+            else:
+                parts.append(self._block_xml(values.get(seg[1], ""), seg[2], seg[3]))
+        document_xml = "".join(parts).encode("utf-8")
+
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+            package.writestr(self._document_info, document_xml)
+            for info, data in self._parts.items():
+                package.writestr(info, data)
+
+    def _block_xml(self, value: str, ppr: str, rpr: str) -> str:
+        paragraphs = []
+        for line in (value or "").split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            line_ppr = ppr
+            if line.startswith("- ") and self._bullet_style:
+                line = line[2:].strip()
+                line_ppr = _with_style(ppr, self._bullet_style)
+            paragraphs.append(
+                f'<w:p>{line_ppr}<w:r>{rpr}<w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+            )
+        return "".join(paragraphs)
+
+
+def _split_inline(xml: str) -> List:
+    segments = []
+    pos = 0
+    for match in PLACEHOLDER_RE.finditer(xml):
+        segments.append(xml[pos:match.start()])
+        segments.append(("inline", match.group(1)))
+        pos = match.end()
+    segments.append(xml[pos:])
+    return segments
+
+
+def _inline_xml(value: str) -> str:
+    # Line breaks inside a run, same as python-docx does for "\n" in run text
+    lines = [escape(line) for line in (value or "").split("\n")]
+    return '</w:t><w:br/><w:t xml:space="preserve">'.join(lines)
+
+
+def _with_style(ppr: str, style_id: str) -> str:
+    style = f'<w:pStyle w:val="{style_id}"/>'
+    if not ppr:
+        return f"<w:pPr>{style}</w:pPr>"
+    ppr = re.sub(r"<w:pStyle [^>]*/>", "", ppr)
+    return ppr.replace("<w:pPr>", f"<w:pPr>{style}", 1)
+
+
+def _merge_split_placeholders(doc: "Document"):
+    # Word often splits "{{NAME}}" over several runs; fold such paragraphs
+    # into a single run so every placeholder shows up whole in the XML
+    def fix(p):
+        for placeholder in set(m.group(0) for m in PLACEHOLDER_RE.finditer(p.text)):
+            if sum(r.text.count(placeholder) for r in p.runs) < p.text.count(placeholder):
+                p.text = p.text
+                return
+
+    for p in doc.paragraphs:
+        fix(p)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for p in cell.paragraphs:
+                    fix(p)
+
+
+def default_layout() -> "Document":
+    """The built-in letter layout, used when there is no usable template."""
+    from docx import Document
+
+    doc = Document()
+    p = doc.add_paragraph("{{FULL_NAME}}")
+    p.runs[0].bold = True
+
+    for text in [
+        "{{CONTACT_LINE}}", "{{EMAIL}}", "{{LINKS_LINE}}", "",
+        "{{DATE}}", "",
+        "Hiring Committee", "{{DEPARTMENT}}", "University at Buffalo", "{{CAMPUS}}", "",
+        "Dear Hiring Committee,", "",
+        "{{BODY}}", "",
+        "Sincerely,", "{{FULL_NAME}}",
+    ]:
+        doc.add_paragraph(text)
+    return doc
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def get_template(template_path: Optional[str]) -> CompiledTemplate:
+    """
+    Returns the compiled template for template_path, compiling it on first use
+    (and again if the file changes). Falls back to the default layout when the
+    file is missing or has no placeholders.
+    """
+    key = None
+    if template_path and os.path.exists(template_path):
+        key = (os.path.abspath(template_path), os.path.getmtime(template_path))
+
+    with _compiled_lock:
+        if key not in _compiled:
+            from docx import Document
+
+            template = CompiledTemplate(Document(template_path)) if key else None
+            if template is None or not template.placeholders:
+                template = _compiled.get(None) or CompiledTemplate(default_layout())
+                _compiled[None] = template
+            _compiled[key] = template
+        return _compiled[key]
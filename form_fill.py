@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+from .config import FORM_LAYOUTS_FILE, FORM_SECTION_TIMEOUT_SECONDS
+
+# Identifies a form layout: the ids/names of its controls with numbers masked
+# (record ids differ per application), hashed with 32-bit FNV-1a
+FINGERPRINT_JS = """
+() => {
+    const keys = Array.from(document.querySelectorAll("form input, form select, form textarea"))
+        .filter(e => e.type !== "hidden")
+        .map(e => e.tagName + ":" + (e.id || e.name || "").replace(/[0-9]+/g, "#"))
+        .sort();
+    let hash = 0x811c9dc5;
+    for (const ch of keys.join("|")) {
+        hash ^= ch.charCodeAt(0);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    return location.pathname.replace(/[0-9]+/g, "#") + "#" + hash.toString(16);
+}
+"""
+
+# Fills a whole form section in one page.evaluate call instead of one
+# page.fill / query_selector round trip per field. Selectors that worked on
+# this layout before are tried first.
+FILL_JS = """
+({fields, layouts}) => {
+    const fingerprint = (FINGERPRINT)();
+    const known = layouts[fingerprint] || {};
+    const report = {fingerprint, filled: {}, missing: [], known: 0};
+    for (const field of fields) {
+        const learned = known[field.name];
+        const selectors = learned
+            ? [learned, ...field.selectors.filter(s => s !== learned)]
+            : field.selectors;
+        let el = null, used = null;
+        for (const selector of selectors) {
+            el = document.querySelector(selector);
+            if (el) { used = selector; break; }
+        }
+        if (!el) { report.missing.push(field.name); continue; }
+
+        if (el.tagName === "SELECT") {
+            const option = Array.from(el.options).find(
+                o => o.label.trim() === field.value || o.value === field.value
+            );
+            if (!option) { report.missing.push(field.name); continue; }
+            el.value = option.value;
+        } else {
+            // Native setter, so scripts watching the field see a real change
+            const proto = el.tagName === "TEXTAREA" ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, "value").set.call(el, field.value);
+        }
+        el.dispatchEvent(new Event("input", {bubbles: true}));
+        el.dispatchEvent(new Event("change", {bubbles: true}));
+        report.filled[field.name] = used;
+        if (used === learned) report.known += 1;
+    }
+    return report;
+}
+""".replace("(FINGERPRINT)", f"({FINGERPRINT_JS.strip()})")
+
+# Fingerprint and selector lookup in one round trip: the first selector (learned
+# one first) that matches. Playwright-only selectors (:has-text, ...) are not
+# valid CSS; they are returned unresolved, for query_selector to try in order.
+FIND_JS = """
+({name, selectors, layouts}) => {
+    const fingerprint = (FINGERPRINT)();
+    const learned = (layouts[fingerprint] || {})[name];
+    const ordered = learned ? [learned, ...selectors.filter(s => s !== learned)] : selectors;
+    const candidates = [];
+    for (const selector of ordered) {
+        try {
+            if (document.querySelector(selector)) { candidates.push(selector); break; }
+        } catch (e) {
+            candidates.push(selector);
+        }
+    }
+    return {fingerprint, candidates};
+}
+""".replace("(FINGERPRINT)", f"({FINGERPRINT_JS.strip()})")
+
+# True once none of the selectors matches a visible element (CSS selectors, as filled by FILL_JS)
+SECTION_CLOSED_JS = """
+(selectors) => !selectors.some(selector =>
+    Array.from(document.querySelectorAll(selector)).some(e => e.offsetParent !== null)
+)
+"""
+
+
+class FormLayouts:
+    """
+    Which selector resolved each logical field, per form layout fingerprint.
+    Saved to disk so later applications on the same layout skip the probing.
+    """
+
+    def __init__(self, path=FORM_LAYOUTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._layouts = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._layouts = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read form layouts, relearning: {e}")
+
+    def all(self):
+        with self._lock:
+            return {fp: dict(fields) for fp, fields in self._layouts.items()}
+
+    def get(self, fingerprint):
+        with self._lock:
+            return dict(self._layouts.get(fingerprint, {}))
+
+    def record(self, fingerprint, resolved):
+        with self._lock:
+            fields = self._layouts.setdefault(fingerprint, {})
+            for name, selector in resolved.items():
+                if fields.get(name) != selector:
+                    fields[name] = selector
+                    self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._layouts, indent=2, sort_keys=True)
+            self._dirty = False
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+form_layouts = FormLayouts()
+
+
+def wait_for_section(page, selectors, timeout=FORM_SECTION_TIMEOUT_SECONDS):
+    """
+    Waits until any of the section's field selectors is attached, since
+    sections loaded over AJAX or in a modal are not there yet at
+    DOMContentLoaded. A field the section doesn't have costs nothing as long
+    as another one shows up. Returns False on timeout; the fill then reports
+    what is missing.
+    """
+    try:
+        page.wait_for_selector(", ".join(dict.fromkeys(selectors)), state="attached", timeout=timeout * 1000)
+        return True
+    except Exception as e:
+        print(f"Form section did not load in {timeout}s: {e}")
+        return False
+
+
+def wait_for_section_closed(page, selectors, timeout=FORM_SECTION_TIMEOUT_SECONDS):
+    """
+    Waits until none of the selectors (the fields just filled) matches a
+    visible element, i.e. the entry form was saved and closed or replaced.
+    Returns False on timeout.
+    """
+    try:
+        page.wait_for_function(SECTION_CLOSED_JS, list(dict.fromkeys(selectors)), timeout=timeout * 1000)
+        return True
+    except Exception as e:
+        print(f"Form section did not close in {timeout}s: {e}")
+        return False
+
+
+def fill_fields(page, fields, layouts=form_layouts):
+    """
+    Sets every field of a form section in a single round trip, once one of
+    its fields is on the page (see wait_for_section).
+
+    fields maps a logical field name to (selectors, value); the selector
+    learned for this layout is tried first, then the given ones in order
+    (selects match on option label or value). Fields whose value is None
+    are left alone.
+
+    Returns {"fingerprint", "filled": {name: selector used}, "missing": [names not found],
+    "known": how many fields used a learned selector}.
+    """
+    payload = [
+        {"name": name, "selectors": list(selectors), "value": str(value)}
+        for name, (selectors, value) in fields.items()
+        if value is not None
+    ]
+    if payload:
+        wait_for_section(page, [selector for field in payload for selector in field["selectors"]])
+    report = page.evaluate(FILL_JS, {"fields": payload, "layouts": layouts.all()})
+    layouts.record(report["fingerprint"], report["filled"])
+    return report
+
+
+def find_element(page, name, selectors, layouts=form_layouts):
+    """
+    query_selector over a fallback chain (Playwright selectors allowed),
+    starting with the selector that worked on this layout last time. CSS
+    selectors are resolved in the same round trip as the layout fingerprint.
+    """
+    found = page.evaluate(FIND_JS, {"name": name, "selectors": list(selectors),
+                                    "layouts": layouts.all()})
+    fingerprint = found["fingerprint"]
+    for selector in found["candidates"]:
+        el = page.query_selector(selector)
+        if el:
+            layouts.record(fingerprint, {name: selector})
+            return el
+    return None
+
+
+def print_report(section, report):
+    filled = len(report["filled"])
+    total = filled + len(report["missing"])
+    known = f", {report['known']} from learned layout" if report.get("known") else ""
+    print(f"{section}: filled {filled}/{total} fields{known}.")
+    if report["missing"]:
+        print(f" -> Not found: {', '.join(report['missing'])}")
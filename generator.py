@@ -1,18 +1,155 @@
+import asyncio
+import hashlib
+import json
 import os
+import random
 import re
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from dotenv import load_dotenv
-from docx import Document
-from docx.shared import Pt
-from openai import OpenAI
+from .config import LOGS_DIR, GENERATED_DOCS_DIR
+from .description import estimate_tokens, truncate_to_tokens
+from .docx_template import get_template
+from .tracing import span, annotate
 
-DEFAULT_OUTPUT_DIR = "generated_docs"
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+DEFAULT_OUTPUT_DIR = GENERATED_DOCS_DIR
 DEFAULT_TEMPLATE_PATH = "templates/cover_template.docx"
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-5-mini-2025-08-07")
+DEFAULT_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))
+DEFAULT_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+DEFAULT_MAX_RETRIES = 5
+# Longest wait between two attempts, whatever Retry-After says
+MAX_BACKOFF_SECONDS = 30.0
+DEFAULT_PROMPT_TOKEN_BUDGET = int(os.getenv("OPENAI_PROMPT_TOKEN_BUDGET", "2000"))
+TEMPERATURE = 0.7
+MAX_OUTPUT_TOKENS = 900
+
+DEFAULT_CACHE_DIR = os.path.join(LOGS_DIR, "llm_cache")
+CACHE_MAX_AGE_DAYS = 30
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# The openai package takes longer to import than the rest of the agent, and
+# discovery-only runs never call it: it is imported, and the client created,
+# on first use
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The shared synchronous OpenAI client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            _client = OpenAI()
+        return _client
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> tuple:
+    """Errors worth another try; anything else (bad request, auth) fails right away."""
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+    return (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, asyncio.TimeoutError)
+
+
+def __getattr__(name):
+    # generator.client and generator.RETRYABLE_ERRORS still work, lazily
+    if name == "client":
+        return get_client()
+    if name == "RETRYABLE_ERRORS":
+        return retryable_errors()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of LLM outputs: one JSON file per request, named by
+    a hash of everything that shapes the answer (model, both prompts, sampling
+    settings). Entries older than max_age_days are misses; evict() trims the
+    oldest files once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_age_days: float = CACHE_MAX_AGE_DAYS,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_days * 86400
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(request_args: Dict) -> str:
+        return hashlib.sha256(json.dumps(request_args, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        text = None
+        try:
+            if time.time() - os.path.getmtime(path) <= self.max_age_seconds:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = json.load(f)["output_text"]
+        except (OSError, ValueError, KeyError):
+            pass
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def put(self, key: str, output_text: str):
+        _ensure_dir(self.cache_dir)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"output_text": output_text, "created_at": time.time()}, f)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Drops expired entries, then the oldest ones until under max_bytes. Returns how many were removed."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                os.remove(path)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0
+        return f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
 
-client = OpenAI()
+
+response_cache = ResponseCache()
 
 
 def _skills_highlight_by_resume_type(resume_type: str) -> str:
@@ -35,14 +172,19 @@ def _skills_highlight_by_resume_type(resume_type: str) -> str:
     return "Highlight the most relevant strengths for this role."
 
 
-def generate_cover_letter_body_llm(
+def build_prompts(
     job_data: Dict,
     resume_type: str,
     personal_info: Dict,
     tone_instructions: Optional[str] = None,
     template_prompt: Optional[str] = None,
-    model: str = DEFAULT_MODEL,
-) -> str:
+    token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+) -> Tuple[str, str]:
+    """
+    Returns the (system_prompt, user_prompt) pair for one cover letter body.
+    The job description is shortened so both prompts together stay within
+    token_budget (estimated) tokens.
+    """
     title = job_data.get("Job_Title", "the role")
     job_id = job_data.get("Job_ID", "")
     dept = job_data.get("Department", "the department")
@@ -67,7 +209,8 @@ def generate_cover_letter_body_llm(
         "Follow the user's tone and structure instructions exactly."
     )
 
-    user_prompt = f"""
+    def user_prompt_with(description: str) -> str:
+        return f"""
 Write the cover letter body for this application.
 
 Candidate:
@@ -89,17 +232,128 @@ If a custom template/prompt is provided, follow it:
 {template_prompt or "None"}
 """.strip()
 
-    resp = client.responses.create(
+    # The description is the only part that can grow; it gets what is left of the budget
+    overhead = estimate_tokens(system_prompt) + estimate_tokens(user_prompt_with(""))
+    user_prompt = user_prompt_with(truncate_to_tokens(description, token_budget - overhead))
+
+    return system_prompt, user_prompt
+
+
+def _request_args(system_prompt: str, user_prompt: str, model: str) -> Dict:
+    return dict(
         model=model,
         input=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        temperature=0.7,
-        max_output_tokens=900,
+        temperature=TEMPERATURE,
+        max_output_tokens=MAX_OUTPUT_TOKENS,
     )
 
-    return resp.output_text.strip()
+
+def generate_cover_letter_body_llm(
+    job_data: Dict,
+    resume_type: str,
+    personal_info: Dict,
+    tone_instructions: Optional[str] = None,
+    template_prompt: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+) -> str:
+    with span("generate", job_id=job_data.get("Job_ID"), resume_type=resume_type) as s:
+        system_prompt, user_prompt = build_prompts(
+            job_data, resume_type, personal_info, tone_instructions, template_prompt
+        )
+        request_args = _request_args(system_prompt, user_prompt, model)
+        key = ResponseCache.key(request_args)
+        cached = response_cache.get(key)
+        s.set(cached=cached is not None)
+        if cached is not None:
+            return cached
+
+        resp = get_client().responses.create(**request_args)
+        body = resp.output_text.strip()
+        response_cache.put(key, body)
+        return body
+
+
+def _backoff_delay(attempt: int, error: Exception) -> float:
+    # Honor the server's Retry-After on rate limits (clamped, so a huge or bogus
+    # value can't stall the pipeline), otherwise exponential backoff
+    # (1s, 2s, 4s... capped at MAX_BACKOFF_SECONDS) with full jitter
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            delay = None
+        if delay is not None and delay == delay:  # not NaN
+            return min(max(delay, 0.0), MAX_BACKOFF_SECONDS)
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, 2.0 ** attempt))
+
+
+async def _generate_body_async(
+    async_client: "AsyncOpenAI",
+    semaphore: asyncio.Semaphore,
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    timeout: float,
+    max_retries: int,
+) -> str:
+    request_args = _request_args(system_prompt, user_prompt, model)
+    key = ResponseCache.key(request_args)
+    cached = response_cache.get(key)
+    annotate(cached=cached is not None)
+    if cached is not None:
+        return cached
+
+    for attempt in range(max_retries + 1):
+        annotate(attempts=attempt + 1)
+        try:
+            # Only hold a slot while a request is in flight, not while backing off
+            async with semaphore:
+                resp = await asyncio.wait_for(async_client.responses.create(**request_args), timeout)
+            body = resp.output_text.strip()
+            response_cache.put(key, body)
+            return body
+        except retryable_errors() as e:
+            if attempt == max_retries:
+                raise
+            delay = _backoff_delay(attempt, e)
+            print(f" -> LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+
+def new_async_client(timeout: float = DEFAULT_TIMEOUT) -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+    # Retries are done in _generate_body_async (with jitter), not inside the SDK
+    return AsyncOpenAI(max_retries=0, timeout=timeout)
+
+
+async def generate_cover_letter_body_async(
+    async_client: "AsyncOpenAI",
+    semaphore: asyncio.Semaphore,
+    job_data: Dict,
+    resume_type: str,
+    personal_info: Dict,
+    tone_instructions: Optional[str] = None,
+    template_prompt: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> str:
+    """
+    Async version of generate_cover_letter_body_llm. The semaphore caps how
+    many requests sharing it are in flight at once.
+    """
+    with span("generate", job_id=job_data.get("Job_ID"), resume_type=resume_type):
+        system_prompt, user_prompt = build_prompts(
+            job_data, resume_type, personal_info, tone_instructions, template_prompt
+        )
+        return await _generate_body_async(
+            async_client, semaphore, system_prompt, user_prompt, model, timeout, max_retries
+        )
 
 
 def _ensure_dir(path: str):
@@ -111,58 +365,6 @@ def _sanitize_filename(text: str) -> str:
     return re.sub(r"[^a-zA-Z0-9_-]+", "_", text).strip("_")
 
 
-def _replace_placeholders(doc: Document, mapping: Dict[str, str]) -> bool:
-    found_any = False
-
-    def replace_in_paragraph(p):
-        nonlocal found_any
-        original = p.text
-        new_text = original
-        for k, v in mapping.items():
-            if k in new_text:
-                new_text = new_text.replace(k, v)
-        if new_text != original:
-            p.text = new_text
-            found_any = True
-
-    for p in doc.paragraphs:
-        replace_in_paragraph(p)
-
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    replace_in_paragraph(p)
-
-    return found_any
-
-
-def _add_body_paragraphs(doc: Document, body_text: str):
-    chunks = [c.strip() for c in body_text.split("\n")]
-    bullet_buffer = []
-
-    for line in chunks:
-        if not line:
-            if bullet_buffer:
-                for b in bullet_buffer:
-                    doc.add_paragraph(b, style="List Bullet")
-                bullet_buffer = []
-            continue
-
-        if line.startswith("- "):
-            bullet_buffer.append(line[2:].strip())
-        else:
-            if bullet_buffer:
-                for b in bullet_buffer:
-                    doc.add_paragraph(b, style="List Bullet")
-                bullet_buffer = []
-            doc.add_paragraph(line)
-
-    if bullet_buffer:
-        for b in bullet_buffer:
-            doc.add_paragraph(b, style="List Bullet")
-
-
 def generate_cover_letter_docx(
     job_data: Dict,
     resume_type: str,
@@ -172,6 +374,7 @@ def generate_cover_letter_docx(
     tone_instructions: Optional[str] = None,
     template_prompt: Optional[str] = None,
     use_llm: bool = True,
+    body_text: Optional[str] = None,
 ) -> str:
     _ensure_dir(output_dir)
 
@@ -181,7 +384,8 @@ def generate_cover_letter_docx(
     dept = job_data.get("Department", "Hiring Committee")
     campus_or_location = job_data.get("Campus", "")
 
-    if use_llm:
+    # body_text is passed in when the LLM call already ran (see pipeline._generate_stage)
+    if body_text is None and use_llm:
         body_text = generate_cover_letter_body_llm(
             job_data=job_data,
             resume_type=resume_type,
@@ -189,7 +393,7 @@ def generate_cover_letter_docx(
             tone_instructions=tone_instructions,
             template_prompt=template_prompt,
         )
-    else:
+    elif body_text is None:
         body_text = (
             f"I am excited to apply for the {title} role in {dept}. "
             "My background aligns well with your needs, and I’m confident I can contribute immediately.\n\n"
@@ -198,76 +402,35 @@ def generate_cover_letter_docx(
             "Thank you for your consideration. I look forward to discussing fit and next steps."
         )
 
-    doc = None
-    template_used = False
-
-    if template_path and os.path.exists(template_path):
-        doc = Document(template_path)
-        template_used = True
-    else:
-        doc = Document()
-
-    mapping = {
-        "{{DATE}}": date_str,
-        "{{DEPARTMENT}}": dept,
-        "{{TITLE}}": title,
-        "{{JOB_ID}}": job_id,
-        "{{BODY}}": body_text,
-        "{{FIRST_NAME}}": personal_info.get("first_name", ""),
-        "{{LAST_NAME}}": personal_info.get("last_name", ""),
-        "{{EMAIL}}": personal_info.get("email", ""),
-        "{{PHONE}}": personal_info.get("phone", ""),
-        "{{LOCATION}}": personal_info.get("location", ""),
-        "{{LINKEDIN}}": personal_info.get("linkedin", ""),
-        "{{GITHUB}}": personal_info.get("github", ""),
-        "{{CAMPUS}}": campus_or_location,
+    full_name = f"{personal_info.get('first_name','')} {personal_info.get('last_name','')}".strip()
+    phone = personal_info.get("phone", "")
+    values = {
+        "DATE": date_str,
+        "DEPARTMENT": dept,
+        "TITLE": title,
+        "JOB_ID": job_id,
+        "BODY": body_text,
+        "FIRST_NAME": personal_info.get("first_name", ""),
+        "LAST_NAME": personal_info.get("last_name", ""),
+        "EMAIL": personal_info.get("email", ""),
+        "PHONE": phone,
+        "LOCATION": personal_info.get("location", ""),
+        "LINKEDIN": personal_info.get("linkedin", ""),
+        "GITHUB": personal_info.get("github", ""),
+        "CAMPUS": campus_or_location,
+        # Lines of the built-in layout (used when there is no template)
+        "FULL_NAME": full_name,
+        "CONTACT_LINE": f"{personal_info.get('location', 'Potsdam, NY')} | {phone}".strip(" |"),
+        "LINKS_LINE": f"{personal_info.get('linkedin', 'LinkedIn')} | {personal_info.get('github', 'GitHub')}".strip(" |"),
     }
 
-    placeholders_found = _replace_placeholders(doc, mapping) if template_used else False
-
-    if not placeholders_found:
-        doc = Document()
-
-        full_name = f"{personal_info.get('first_name','')} {personal_info.get('last_name','')}".strip()
-        location = personal_info.get("location", "Potsdam, NY")
-        phone = personal_info.get("phone", "")
-        email = personal_info.get("email", "")
-        linkedin = personal_info.get("linkedin", "LinkedIn")
-        github = personal_info.get("github", "GitHub")
-
-        p = doc.add_paragraph(full_name)
-        p.runs[0].bold = True
-
-        doc.add_paragraph(f"{location} | {phone}".strip(" |"))
-        doc.add_paragraph(email)
-        doc.add_paragraph(f"{linkedin} | {github}".strip(" |"))
-        doc.add_paragraph("")
-        doc.add_paragraph(date_str)
-        doc.add_paragraph("")
-        doc.add_paragraph("Hiring Committee")
-        doc.add_paragraph(dept)
-        doc.add_paragraph("University at Buffalo")
-        if campus_or_location:
-            doc.add_paragraph(campus_or_location)
-        doc.add_paragraph("")
-        doc.add_paragraph("Dear Hiring Committee,")
-        doc.add_paragraph("")
-        _add_body_paragraphs(doc, body_text)
-        doc.add_paragraph("")
-        doc.add_paragraph("Sincerely,")
-        doc.add_paragraph(full_name)
-
-    for style in doc.styles:
-        if style.type == 1:
-            try:
-                style.font.name = "Times New Roman"
-                style.font.size = Pt(12)
-            except Exception:
-                pass
+    # Parsed and styled once per template file, then reused for every letter
+    template = get_template(template_path)
 
     safe_job_id = _sanitize_filename(job_id)
     filename = os.path.join(output_dir, f"Cover_Letter_{safe_job_id}.docx")
-    doc.save(filename)
+    with span("docx", job_id=job_id):
+        template.render(values, filename)
     return filename
 
 def generate_cover_letter(
@@ -0,0 +1,123 @@
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from .config import SCRAPE_CONCURRENCY, HTTP_TIMEOUT_SECONDS
+from .description import clean_description
+from .posting_cache import content_hash, job_from_entry
+from .tracing import span, annotate
+
+# Posting pages shorter than this (after stripping scripts) are most likely a JS shell
+MIN_BODY_CHARS = 200
+
+
+def build_session(page, pool_size=SCRAPE_CONCURRENCY):
+    """
+    Creates a keep-alive HTTP session that carries the browser's login cookies,
+    so posting pages can be fetched without a Chromium navigation.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    for cookie in page.context.cookies():
+        session.cookies.set(
+            cookie["name"], cookie["value"],
+            domain=cookie.get("domain", ""), path=cookie.get("path", "/")
+        )
+
+    # Same User-Agent as the browser so the portal treats both the same way
+    session.headers["User-Agent"] = page.evaluate("navigator.userAgent")
+    return session
+
+
+def fetch_posting(session, target, cache=None):
+    """
+    Fetches and parses one posting detail page over HTTP.
+    Returns the job dict, or None when the page has to go through the browser
+    (login redirect, JS-only page or network error).
+
+    With a cache, the request is conditional (ETag / Last-Modified) and a page
+    whose content hash is unchanged is not parsed again.
+    """
+    job_id, job_info = target
+    with span("detail", job_id=job_id, backend="http") as s:
+        job = _fetch_posting(session, target, cache)
+        s.set(found=job is not None, unchanged=bool(job and job.get("Unchanged")))
+        return job
+
+
+def _fetch_posting(session, target, cache=None):
+    job_id, job_info = target
+    link = job_info['href']
+    headers = cache.validators(job_id) if cache else {}
+
+    try:
+        resp = session.get(link, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code == 304:
+            annotate(status=304)
+            entry = cache.get(job_id)
+            if entry:
+                cache.touch(job_id, etag, last_modified)
+                return job_from_entry(job_id, link, entry)
+            # Entry expired in the meantime, ask again without validators
+            resp = session.get(link, timeout=HTTP_TIMEOUT_SECONDS)
+        resp.raise_for_status()
+        annotate(status=resp.status_code, bytes=len(resp.content))
+    except Exception as e:
+        print(f"HTTP fetch failed for {link}: {e}")
+        return None
+
+    page_hash = content_hash(resp.content)
+    if cache:
+        entry = cache.lookup(job_id, page_hash, etag, last_modified)
+        if entry:
+            return job_from_entry(job_id, link, entry)
+
+    job = parse_posting(resp.text, resp.url, job_id, job_info)
+    if job and cache:
+        cache.put(job, page_hash, etag, last_modified)
+    return job
+
+
+def parse_posting(html, url, job_id, job_info):
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Session cookies did not carry over; let the logged-in browser handle it
+    if "login" in url or soup.select_one("input#user_username"):
+        return None
+
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+
+    body = soup.body or soup
+    text = body.get_text("\n", strip=True)
+    if len(text) < MIN_BODY_CHARS:
+        return None
+
+    return {
+        "Job_ID": job_id,
+        "Job_Title": job_info['title'],
+        "Department": _find_department(soup),
+        "Description": clean_description(text),
+        "Link": job_info['href']
+    }
+
+
+def _find_department(soup):
+    # Same two layouts the browser scraper looks for:
+    # <tr><th>Department</th><td>...</td></tr> and <li><span class="label">Department</span><span class="value">
+    for row in soup.find_all("tr"):
+        cells = row.find_all(["th", "td"])
+        if len(cells) > 1 and "Department" in cells[0].get_text():
+            return cells[1].get_text(" ", strip=True)
+
+    for item in soup.find_all("li"):
+        label = item.select_one("span.label")
+        value = item.select_one("span.value")
+        if label and value and "Department" in label.get_text():
+            return value.get_text(" ", strip=True)
+
+    return "Unknown"
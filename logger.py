@@ -1,30 +1,160 @@
+import atexit
+import csv
 import os
-import pandas as pd
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from .config import LOGS_DIR
+from .config import LOGS_DIR, STATUS_FLUSH_BATCH, ensure_dirs
 
+DB_FILE = os.path.join(LOGS_DIR, "jobs.db")
+# CSV export of the job store, for opening in Excel
 LOG_FILE = os.path.join(LOGS_DIR, "jobs_log.csv")
 
+COLUMNS = [
+    "Date_Discovered", "Job_ID", "Job_Title", "Department",
+    "Resume_Type", "Status", "Submission_Date", "Confirmation_Num",
+    "Deadline", "Notes"
+]
+
+# Several threads and processes may log at once. Within a process one connection
+# is shared behind _lock; across processes SQLite's write lock (BEGIN IMMEDIATE)
+# serializes writers, and busy_timeout makes them wait instead of failing.
+_conn = None
+_conn_pid = None
+_lock = threading.RLock()
+_batch_depth = 0
+# Status changes waiting to be flushed: Job_ID -> {column: value}
+_pending = {}
+
+
+def _connect():
+    global _conn, _conn_pid
+    # A connection inherited through fork() must not be reused by the child
+    if _conn is None or _conn_pid != os.getpid():
+        ensure_dirs()
+        _conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+        _conn_pid = os.getpid()
+        _conn.execute("PRAGMA busy_timeout=30000")
+        _conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only syncs at checkpoints, not on every commit
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _create_table(_conn, COLUMNS)
+        _migrate_csv(_conn)
+    return _conn
+
+
+def _create_table(conn, columns):
+    column_defs = ", ".join(
+        f'"{c}" TEXT PRIMARY KEY' if c == "Job_ID" else f'"{c}" TEXT' for c in columns
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS jobs ({column_defs})")
+
+
+def _merge_columns(fieldnames):
+    """
+    The CSV's columns in their own order, with any missing COLUMNS slotted
+    in after the column they follow in COLUMNS.
+    """
+    merged = [c for c in fieldnames if c]
+    for i, col in enumerate(COLUMNS):
+        if col not in merged:
+            merged.insert(merged.index(COLUMNS[i - 1]) + 1 if i else 0, col)
+    return merged
+
+
+def _migrate_csv(conn):
+    # One-time import of the old pandas-written jobs_log.csv
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have imported it while we waited for the lock
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            conn.execute("COMMIT")
+            return
+        if os.path.exists(LOG_FILE):
+            with open(LOG_FILE, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+                # Keep hand-added columns, in the CSV's order, so re-exports diff cleanly
+                if conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is None:
+                    conn.execute("DROP TABLE jobs")
+                    _create_table(conn, _merge_columns(reader.fieldnames or []))
+                else:
+                    existing = _table_columns(conn)
+                    for col in reader.fieldnames or []:
+                        if col and col not in existing:
+                            conn.execute(f'ALTER TABLE jobs ADD COLUMN "{col}" TEXT')
+            for row in rows:
+                if row.get("Job_ID"):
+                    _insert(conn, row, ignore=True)
+            print(f"Imported {len(rows)} jobs from {LOG_FILE} into {DB_FILE}.")
+        conn.execute("PRAGMA user_version = 1")
+        conn.execute("COMMIT")
+    except BaseException:
+        # Never leave the shared connection inside a transaction holding the write lock
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _table_columns(conn):
+    return [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+
+
+def _insert(conn, row, ignore=False):
+    cols = list(row)
+    names = ", ".join(f'"{c}"' for c in cols)
+    marks = ", ".join("?" for _ in cols)
+    verb = "INSERT OR IGNORE" if ignore else "INSERT"
+    return conn.execute(f"{verb} INTO jobs ({names}) VALUES ({marks})", [row[c] for c in cols])
+
+
+@contextmanager
+def batch():
+    """
+    Groups every log call inside the block into one transaction:
+
+        with batch():
+            for job in jobs:
+                log_job(job)
+
+    Yields the shared connection, for modules keeping their own tables in the store.
+    """
+    global _batch_depth
+    with _lock:
+        conn = _connect()
+        if _batch_depth == 0:
+            # Take the write lock up front so two writers never deadlock upgrading
+            conn.execute("BEGIN IMMEDIATE")
+        _batch_depth += 1
+        try:
+            yield conn
+        except BaseException:
+            _batch_depth -= 1
+            if _batch_depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            _batch_depth -= 1
+            if _batch_depth == 0:
+                conn.execute("COMMIT")
+
+
 def init_log():
-    if not os.path.exists(LOG_FILE):
-        df = pd.DataFrame(columns=[
-            "Date_Discovered", "Job_ID", "Job_Title", "Department", 
-            "Resume_Type", "Status", "Submission_Date", "Confirmation_Num", 
-            "Deadline", "Notes"
-        ])
-        df.to_csv(LOG_FILE, index=False)
+    _connect()
+
 
 def log_job(job_data):
-    init_log()
-    df = pd.read_csv(LOG_FILE)
-    
-    # Check if job already exists
-    if str(job_data["Job_ID"]) in df["Job_ID"].astype(str).values:
-        return False # Already logged
-        
+    """
+    Adds the job to the store. A job that is already logged keeps its status,
+    only its title, department and resume type are refreshed.
+    Returns True if the job was new.
+    """
+    job_id = str(job_data["Job_ID"])
     new_row = {
         "Date_Discovered": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "Job_ID": job_data.get("Job_ID"),
+        "Job_ID": job_id,
         "Job_Title": job_data.get("Job_Title"),
         "Department": job_data.get("Department"),
         "Resume_Type": job_data.get("Resume_Type", "Pending"),
@@ -34,19 +164,114 @@ def log_job(job_data):
         "Deadline": job_data.get("Deadline", ""),
         "Notes": job_data.get("Notes", "")
     }
-    
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    df.to_csv(LOG_FILE, index=False)
-    return True
+
+    with batch():
+        conn = _connect()
+        if _insert(conn, new_row, ignore=True).rowcount:
+            return True
+        conn.execute(
+            """UPDATE jobs SET Job_Title = COALESCE(?, Job_Title),
+                              Department = COALESCE(?, Department),
+                              Resume_Type = COALESCE(?, Resume_Type)
+               WHERE Job_ID = ?""",
+            (job_data.get("Job_Title"), job_data.get("Department"), job_data.get("Resume_Type"), job_id)
+        )
+    return False # Already logged
+
+
+def known_job_ids():
+    with _lock:
+        return {row[0] for row in _connect().execute("SELECT Job_ID FROM jobs")}
+
+
+def resume_types():
+    """Job_ID -> logged Resume_Type."""
+    with _lock:
+        return dict(_connect().execute("SELECT Job_ID, Resume_Type FROM jobs"))
+
+
+def status_counts():
+    """Number of jobs per Status, most common first."""
+    with _lock:
+        flush()
+        rows = _connect().execute(
+            'SELECT COALESCE(NULLIF("Status", \'\'), \'(none)\'), COUNT(*) FROM jobs GROUP BY 1 ORDER BY 2 DESC'
+        ).fetchall()
+    return dict(rows)
+
 
 def update_status(job_id, status, notes=""):
-    init_log()
-    df = pd.read_csv(LOG_FILE)
-    mask = df["Job_ID"].astype(str) == str(job_id)
-    if mask.any():
-        df.loc[mask, "Status"] = status
-        if notes:
-            df.loc[mask, "Notes"] = notes
-        if status == "Submitted":
-            df.loc[mask, "Submission_Date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        df.to_csv(LOG_FILE, index=False)
+    """
+    Records a status change. Changes are buffered in memory and written in
+    batches of STATUS_FLUSH_BATCH (and on flush()/exit); several changes to
+    the same job in one batch collapse into a single write. Call flush()
+    after a change that must not be lost to a crash.
+    """
+    changes = {"Status": status}
+    if notes:
+        changes["Notes"] = notes
+    if status == "Submitted":
+        changes["Submission_Date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with _lock:
+        _pending.setdefault(str(job_id), {}).update(changes)
+        if len(_pending) >= STATUS_FLUSH_BATCH:
+            flush()
+
+
+def flush():
+    """Writes all buffered status changes in one transaction."""
+    with _lock:
+        if not _pending:
+            return
+        updates = list(_pending.items())
+        _pending.clear()
+        try:
+            with batch():
+                conn = _connect()
+                for job_id, changes in updates:
+                    # Only the changed columns are written, never a stale copy of the row
+                    sets = ", ".join(f'"{c}" = ?' for c in changes)
+                    conn.execute(f"UPDATE jobs SET {sets} WHERE Job_ID = ?", [*changes.values(), job_id])
+        except Exception:
+            # Keep the changes for the next flush, without overwriting newer ones
+            for job_id, changes in updates:
+                _pending[job_id] = {**changes, **_pending.get(job_id, {})}
+            raise
+
+
+def close():
+    """Flushes pending changes and folds the WAL back into the database file."""
+    global _conn
+    with _lock:
+        if _conn is None or _conn_pid != os.getpid():
+            return
+        flush()
+        try:
+            _conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.OperationalError:
+            pass # Another process is still reading; it will checkpoint later
+        _conn.close()
+        _conn = None
+
+atexit.register(close)
+
+
+def export_csv(path=LOG_FILE):
+    """Writes the whole job store to a CSV file. Returns the number of rows."""
+    with _lock:
+        flush()
+        conn = _connect()
+        columns = _table_columns(conn)
+        names = ", ".join(f'"{c}"' for c in columns)
+        rows = conn.execute(f"SELECT {names} FROM jobs ORDER BY rowid").fetchall()
+
+    # Write next to the target and rename, so Excel never sees a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        # "\n" like the pandas-written file, so a re-export only diffs where data changed
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(["" if v is None else v for v in row] for row in rows)
+    os.replace(tmp_path, path)
+    return len(rows)
@@ -1,18 +1,60 @@
+import argparse
 import sys
 import os
-from playwright.sync_api import sync_playwright
-from .config import HEADLESS, RESUME_PATHS, PERSONAL_INFO
-from .auth import login
-from .scraper import scrape_jobs
-from .matcher import determine_resume_type
-from .logger import log_job, update_status
-from .generator import generate_cover_letter
+from .config import (
+    HEADLESS, RESUME_PATHS, PERSONAL_INFO, APPLY_CONCURRENCY, APPLY_TIMEOUT_SECONDS, TRACE_FILE,
+    CHECK_FREQUENCY_HOURS, NEAR_DUPLICATE_ACTION, ARCHIVE_FILE, ensure_dirs,
+)
+from .logger import log_job, update_status, flush, export_csv, status_counts, resume_types, LOG_FILE
+from . import tracing
+from .tracing import span
 
+# Playwright, the scraper, NumPy, the LLM client and python-docx are imported
+# inside the functions that use them, so export-log and status start fast
+# (see benchmark.py --imports)
 
 
-def main():
+def main(trace_file=TRACE_FILE):
+    _traced(_run, trace_file)
+
+
+def _traced(run, trace_file):
+    if trace_file:
+        tracing.enable(trace_file)
+    try:
+        with span("run"):
+            run()
+    finally:
+        summary = tracing.finish()
+        if summary:
+            print(f"\n{summary}")
+
+
+def _run():
+    from playwright.sync_api import sync_playwright
+    from .auth import open_session
+
     print("Starting UB Job Application Agent...")
-    
+    check_required_data()
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=HEADLESS)
+        
+        # Phase 1: Login (or reuse the saved session)
+        with span("login"):
+            context, page = open_session(browser)
+        if not page:
+            print("Login failed. Exiting.")
+            browser.close()
+            return
+
+        scan(context, page)
+        browser.close()
+
+
+def check_required_data():
+    """Creates the data folders and warns about missing personal info or resumes; applications are skipped without them."""
+    ensure_dirs()
     missing_data = []
     if not PERSONAL_INFO["email"]:
         missing_data.append("Personal Info (Email, etc.)")
@@ -26,74 +68,237 @@ def main():
         for item in missing_data:
             print(f" - {item}")
         print("Running in DISCOVERY MODE only.\n")
+
+
+def scan(context, page):
+    """
+    One incremental scan on a logged-in session: discovers new postings,
+    matches them, writes the letters and applies. Returns the jobs that
+    reached the apply stage.
+    """
+    from . import matcher
+    from .matcher import select_resume_type
+    from .pipeline import run_pipeline
+    from .posting_cache import PostingCache
+    from .resource_filter import resource_filter
+    from .scraper import scrape_jobs
+    from .workers import PagePool
+
+    # State kept between scans in the daemon: counters start over, failures get retried
+    resource_filter.reset()
+    matcher.reset()
+    resource_filter.set_phase(page, "search")
         
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-        context = browser.new_context()
-        page = context.new_page()
-        
-        # Phase 1: Login
-        if not login(page):
-            print("Login failed. Exiting.")
-            browser.close()
-            return
-            
-        # Phase 2: Job Discovery
-        jobs = scrape_jobs(page)
-        print(f"Scraped {len(jobs)} jobs.")
+    # Phases 2-5 run as a pipeline: while one job is being applied to,
+    # the next ones are being scraped, matched and written
+    cache = PostingCache()
+    archive = None
+    if ARCHIVE_FILE:
+        from .posting_archive import PostingArchive
+        archive = PostingArchive()
+    duplicates = None
+    if NEAR_DUPLICATE_ACTION != "off":
+        from .near_duplicates import NearDuplicates
+        duplicates = NearDuplicates()
+    
+    # Phase 3: Matching & Logging
+    def classify(job):
+        # Posting unchanged since the last scan: reuse its match and cover letter
+        unchanged = job.get("Unchanged") and job.get("Resume_Type")
+        duplicate = None
+        if not unchanged and duplicates:
+            with span("dedupe", job_id=job["Job_ID"]) as s:
+                duplicate = duplicates.add(job)
+                if duplicate:
+                    s.set(duplicate_of=duplicate["Job_ID"], similarity=round(duplicate["Similarity"], 3))
+        if duplicate:
+            note = f"Near-duplicate of {duplicate['Job_ID']} ({duplicate['Similarity']:.0%} similar)"
+            job["Notes"] = note
+            print(f" -> {job['Job_ID']} flagged: {note}")
+
+        if unchanged:
+            print(f" -> {job['Job_ID']} unchanged since last scan, reusing match: {job['Resume_Type']}")
+        elif duplicate and NEAR_DUPLICATE_ACTION == "skip":
+            if log_job(job):
+                update_status(job["Job_ID"], "Duplicate", notes=note)
+            print(f" -> {job['Job_ID']} skipped.")
+            return False
+        elif duplicate and NEAR_DUPLICATE_ACTION == "reuse" and duplicate["Resume_Type"] not in (None, "", "Pending"):
+            # Same text: same resume. The letter is written anew, since the earlier one names the
+            # other posting's title and Job_ID
+            job["Resume_Type"] = duplicate["Resume_Type"]
+            job["Cover_Letter"] = None
+            print(f" -> {job['Job_ID']} reusing match of {duplicate['Job_ID']}: {job['Resume_Type']}")
+        else:
+            with span("match", job_id=job["Job_ID"]) as s:
+                job["Resume_Type"] = select_resume_type(job["Job_Title"], job["Description"])
+                s.set(resume_type=job["Resume_Type"])
+            print(f" -> {job['Job_ID']} matched resume: {job['Resume_Type']}")
+            job["Cover_Letter"] = None
         
-        # Phase 3: Matching & Logging
-        for job in jobs:
-            print(f"Processing Job {job['Job_ID']}: {job['Job_Title']}")
+        # Log it
+        is_new = log_job(job)
+        if is_new:
+            print(f" -> {job['Job_ID']} logged as new job.")
+        else:
+            print(f" -> {job['Job_ID']} already logged.")
             
-            resume_type = determine_resume_type(job["Job_Title"], job["Description"])
-            job["Resume_Type"] = resume_type
-            print(f" -> Matched Resume: {resume_type}")
-            
-            # Log it
-            is_new = log_job(job)
-            if is_new:
-                print(" -> New job logged.")
-            else:
-                print(" -> Job already logged.")
-                
-            # Phase 4: Cover Letter Generation
-            print(" -> Generating Cover Letter DOCX...")
-            cl_path = generate_cover_letter(job, resume_type, PERSONAL_INFO)
-            print(f" -> Cover Letter saved to {cl_path}")
+    # Phase 4: Cover Letter Generation happens inside the pipeline
 
+    # Phase 5: Apply (Dry Run)
+    # With several workers, each application runs in its own browser context
+    # from the logged-in session, and its result is logged as soon as it finishes
+    pool = None
+    if APPLY_CONCURRENCY > 1:
+        pool = PagePool(_apply, storage_state=context.storage_state(),
+                        concurrency=APPLY_CONCURRENCY, timeout_ms=APPLY_TIMEOUT_SECONDS * 1000,
+                        phase="apply")
+
+    def apply(job):
+        cache.annotate(job["Job_ID"], Resume_Type=job["Resume_Type"], Cover_Letter=job["Cover_Letter"])
+        if duplicates and job["Cover_Letter"]:
+            duplicates.record_letter(job["Job_ID"], job["Cover_Letter"])
+        if job.get("Updated"):
+            # Edited posting already in the log: its new match and letter are kept, no second application
+            print(f" -> {job['Job_ID']} re-matched after an edit ({job['Resume_Type']}), not applying again.")
+            return
+        print(f"Applying to Job {job['Job_ID']}: {job['Job_Title']}")
+        if not job["Cover_Letter"]:
+            print(" -> No cover letter, skipping application.")
+            return
+        if not pool or not pool.submit(job):
+            resource_filter.set_phase(page, "apply")
+            _apply(page, job)
+            resource_filter.set_phase(page, "search")
+
+    try:
+        jobs = run_pipeline(scrape_jobs(page, cache=cache, archive=archive), classify, apply, PERSONAL_INFO)
+    finally:
+        if pool:
+            pool.close()
+        if archive:
+            archive.close()
             
-            # Phase 5: Apply (Dry Run)
-            from .applicant import apply_to_job
-            
-            resume_path = RESUME_PATHS.get(resume_type)
-            if not resume_path or not os.path.exists(resume_path):
-                 print(f" -> ERROR: Resume not found for {resume_type}")
-                 continue
-                 
-            print(" -> Attempting Application (Dry Run)...")
-            result = apply_to_job(page, job, resume_path, cl_path, PERSONAL_INFO)
+    cache.save()
+    updated = sum(1 for job in jobs if job.get("Updated"))
+    print(f"Scraped {len(jobs) - updated} new and {updated} edited jobs; "
+          f"{cache.hits} postings unchanged since the last scan.")
+    if archive:
+        print(archive.report())
+    if duplicates:
+        print(f"{duplicates.flagged} near-duplicates of earlier postings ({NEAR_DUPLICATE_ACTION}).")
+    export_csv()
+    from .generator import response_cache
+    response_cache.evict()
+    print(response_cache.report())
+    print(resource_filter.report())
+    print("\nJob scan and application simulation complete. Check logs/jobs_log.csv for details.")
+    return jobs
 
-            if result == "applied":
-                update_status(job["Job_ID"], "Applied (Dry Run)")
-                print(" -> Application process simulated successfully.")
 
-            elif result == "failed":
-                update_status(job["Job_ID"], "Failed (Dry Run)")
-                print(" -> Application process failed.")
+def _apply(page, job):
+    from .applicant import apply_to_job
+    
+    resume_type = job["Resume_Type"]
+    resume_path = RESUME_PATHS.get(resume_type)
+    if not resume_path or not os.path.exists(resume_path):
+         print(f" -> ERROR: Resume not found for {resume_type}")
+         return
+         
+    print(" -> Attempting Application (Dry Run)...")
+    with span("apply", job_id=job["Job_ID"], resume_type=resume_type) as s:
+        result = apply_to_job(page, job, resume_path, job["Cover_Letter"], PERSONAL_INFO)
+        s.set(result=result)
 
-            elif result == "archived":
-                update_status(job["Job_ID"], "Archived (Dry Run)")
-                print(" -> Application moved to archived state (Dry Run).")
+    if result == "applied":
+        update_status(job["Job_ID"], "Applied (Dry Run)")
+        print(" -> Application process simulated successfully.")
 
-            else:
-                update_status(job["Job_ID"], "Unknown (Dry Run)")
-                print(" -> Unknown result state encountered.")
+    elif result == "failed":
+        update_status(job["Job_ID"], "Failed (Dry Run)")
+        print(" -> Application process failed.")
 
+    elif result == "archived":
+        update_status(job["Job_ID"], "Archived (Dry Run)")
+        print(" -> Application moved to archived state (Dry Run).")
 
-                
-        browser.close()
-        print("\nJob scan and application simulation complete. Check logs/jobs_log.csv for details.")
+    else:
+        update_status(job["Job_ID"], "Unknown (Dry Run)")
+        print(" -> Unknown result state encountered.")
+
+    # Application results go to the job store right away, not with the next status batch,
+    # so a crash or kill can't lose them
+    flush()
+
+
+def reclassify(batch_size=256):
+    """
+    Re-runs resume matching over the latest archived snapshot of every
+    posting, offline, and lists the jobs whose logged resume would change.
+    Nothing is written.
+    """
+    import time
+    from .matcher import select_resume_types
+    from .posting_archive import PostingArchive
+
+    archive = PostingArchive()
+    logged = resume_types()
+    started = time.perf_counter()
+    total = changed = 0
+    batch = []
+
+    def classify_batch():
+        nonlocal total, changed
+        for job, resume_type in zip(batch, select_resume_types(batch)):
+            total += 1
+            before = logged.get(job["Job_ID"])
+            if before and before != resume_type:
+                changed += 1
+                print(f" - {job['Job_ID']} {job.get('Job_Title', '')}: {before} -> {resume_type}")
+        batch.clear()
+
+    try:
+        for job in archive:
+            batch.append(job)
+            if len(batch) >= batch_size:
+                classify_batch()
+        if batch:
+            classify_batch()
+    finally:
+        archive.close()
+    print(f"Reclassified {total} archived postings in {time.perf_counter() - started:.1f}s; "
+          f"{changed} would get a different resume.")
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="UB Job Application Agent")
+    parser.add_argument("--trace", metavar="PATH", default=TRACE_FILE,
+                        help="Record timed spans to PATH (JSON lines) and a Chrome trace next to it")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="Scan for new jobs and apply (default)")
+    commands.add_parser("status", help="Show how many jobs are in each status")
+    commands.add_parser("reclassify", help="Re-run resume matching on the archived postings (offline, read-only)")
+    daemon = commands.add_parser("daemon", help="Stay running and scan every CHECK_FREQUENCY_HOURS")
+    daemon.add_argument("--interval-hours", type=float, default=CHECK_FREQUENCY_HOURS)
+    export = commands.add_parser("export-log", help="Write the job store to a CSV file for Excel")
+    export.add_argument("path", nargs="?", default=LOG_FILE)
+    args = parser.parse_args()
+
+    if args.command == "export-log":
+        rows = export_csv(args.path)
+        print(f"Exported {rows} jobs to {args.path}")
+    elif args.command == "status":
+        counts = status_counts()
+        print(f"{sum(counts.values())} jobs in the log:")
+        for status, count in counts.items():
+            print(f"  {status:<24}{count:>6}")
+    elif args.command == "reclassify":
+        reclassify()
+    elif args.command == "daemon":
+        from .daemon import run_daemon
+        _traced(lambda: run_daemon(args.interval_hours), args.trace)
+    else:
+        main(args.trace)
 
 if __name__ == "__main__":
-    main()
+    cli()
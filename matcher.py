@@ -1,4 +1,9 @@
 import re
+from functools import lru_cache
+
+import numpy as np
+from .config import MATCH_MODE
+from .resume_matcher import resume_similarity
 
 # KEYWORDS DEFINITION
 KEYWORDS = {
@@ -32,7 +37,7 @@ KEYWORDS = {
             "sustainability"
         ]
     },
-    "Associate": {
+    "ASSOCIATE": {
         "role_types": [
             "Program Associate", "Project Coordinator", "Administrative", "Office Analyst", "Donar Analyst",
             "Operations Associate", "Technical Support", "Program Manager", "Database Coordinator",
@@ -50,31 +55,261 @@ KEYWORDS = {
 def normalize_text(text):
     return text.lower()
 
+WORD_RE = re.compile(r"\w+")
+# ASCII characters outside \w become spaces, so str.split() yields the \w runs;
+# bytes >= 128 (UTF-8 sequences) are left alone
+_ASCII_WORDS = bytes(c if chr(c).isalnum() or chr(c) == "_" else 32 for c in range(128)) + bytes(range(128, 256))
+
+def _words(text):
+    # bytes.translate + split runs in C; re.findall over the whole text is several times slower
+    words = text.encode("utf-8").translate(_ASCII_WORDS).decode("utf-8").split()
+    if text.isascii():
+        return words
+    # Non-ASCII punctuation ("data’s", "R–Python") is still inside a word here
+    return [part for word in words for part in ((word,) if word.isascii() else WORD_RE.findall(word))]
+
+def _is_word_char(c):
+    return c.isalnum() or c == "_"
+
+def _is_word_prefix(short, long):
+    """True when long starts with all of short's words ("data" / "data analysis")."""
+    return long.startswith(short) and len(long) > len(short) and not _is_word_char(long[len(short)])
+
+def _word_starts(text, word):
+    """Start offsets of word in text where it stands as a whole word."""
+    p = text.find(word)
+    while p != -1:
+        end = p + len(word)
+        if (p == 0 or not _is_word_char(text[p - 1])) and (end == len(text) or not _is_word_char(text[end])):
+            yield p
+        p = text.find(word, p + 1)
+
+class KeywordIndex:
+    """
+    Whole-word keyword lookup. The text is split into words once, single-word
+    keywords are a set intersection, and a multi-word keyword is only looked
+    for (with str.find) when all of its words occur in the text.
+
+    Same semantics as a (?<!\w)(?=(kw1|kw2|...)(?!\w)) regex: "R", "AI" or
+    "ML" never hit inside other words, a multi-word keyword needs its exact
+    separators, and where several keywords start at the same word only the
+    longest counts.
+    """
+
+    def __init__(self, keywords):
+        self._single = set()
+        by_first = {}
+        for kw in keywords:
+            words = WORD_RE.findall(kw)
+            if not words or not kw.startswith(words[0]) or not kw.endswith(words[-1]):
+                raise ValueError(f"Keyword must start and end with a letter or digit: {kw!r}")
+            if len(words) == 1:
+                self._single.add(kw)
+            else:
+                by_first.setdefault(words[0], []).append((kw, frozenset(words)))
+
+        # Keywords that can never start at the same spot as another are searched
+        # for directly; groups where one is a word-prefix of another ("data" /
+        # "data analysis") are resolved start by start, longest first
+        self._phrases = []
+        self._nested = {}
+        for first, group in by_first.items():
+            group.sort(key=lambda c: len(c[0]), reverse=True)
+            names = [kw for kw, _ in group] + ([first] if first in self._single else [])
+            if any(_is_word_prefix(a, b) for a in names for b in names if a != b):
+                self._nested[first] = group
+            else:
+                self._phrases.extend(group)
+
+    def counts(self, text, distinct=False):
+        """
+        {keyword: occurrences} for the keywords in (lowercased) text.
+        With distinct=True the numbers are only guaranteed to be > 0.
+        """
+        words = _words(text)
+        present = set(words)
+        found = {}
+        for kw in self._single.intersection(present):
+            # Exact counts are needed when a longer keyword may take some of its starts
+            found[kw] = 1 if distinct and kw not in self._nested else words.count(kw)
+
+        for kw, kw_words in self._phrases:
+            if kw_words <= present:
+                starts = _word_starts(text, kw)
+                n = (next(starts, None) is not None) if distinct else sum(1 for _ in starts)
+                if n:
+                    found[kw] = n
+
+        for first in self._nested.keys() & present:
+            candidates = [c for c in self._nested[first] if c[1] <= present]
+            if not candidates:
+                continue
+            for p in _word_starts(text, first):
+                for kw, _ in candidates:
+                    end = p + len(kw)
+                    if text.startswith(kw, p) and (end == len(text) or not _is_word_char(text[end])):
+                        found[kw] = found.get(kw, 0) + 1
+                        if first in found:
+                            found[first] -= 1
+                        break
+        return {kw: n for kw, n in found.items() if n}
+
+def _compile(keywords_by_category):
+    """
+    Builds one KeywordIndex over every keyword of every category.
+    Returns it and a map of lowercased keyword -> categories using it.
+    """
+    owners = {}
+    for category, keywords in keywords_by_category.items():
+        for kw in keywords:
+            owners.setdefault(normalize_text(kw), set()).add(category)
+    return KeywordIndex(owners), owners
+
+# Built once at import
+TITLE_INDEX, TITLE_OWNERS = _compile({c: d["role_types"] for c, d in KEYWORDS.items()})
+SKILL_INDEX, SKILL_OWNERS = _compile({c: d["skills"] for c, d in KEYWORDS.items()})
+
+def match_keywords(text, index, owners):
+    """Number of distinct keywords found per category, in one pass over text."""
+    found = index.counts(normalize_text(text or ""), distinct=True)
+    counts = dict.fromkeys(KEYWORDS, 0)
+    for kw in found:
+        for category in owners[kw]:
+            counts[category] += 1
+    return counts
+
+@lru_cache(maxsize=32)
+def _compile_list(keywords):
+    return _compile({"": keywords})[0]
+
 def count_matches(text, keywords):
-    count = 0
-    text = normalize_text(text)
-    for kw in keywords:
-        if normalize_text(kw) in text:
-            count += 1
-    return count
+    index = _compile_list(tuple(keywords))
+    return len(index.counts(normalize_text(text or ""), distinct=True))
 
 def determine_resume_type(job_title, job_description):
-    scores = {"DATA": 0, "RESEARCH": 0, "ASSOCIATE": 0}
+    scores = dict.fromkeys(KEYWORDS, 0)
     
     # 1. Check Role Title Matches (High Weight)
-    for category, data in KEYWORDS.items():
-        if count_matches(job_title, data["role_types"]) > 0:
+    for category, hits in match_keywords(job_title, TITLE_INDEX, TITLE_OWNERS).items():
+        if hits > 0:
             scores[category] += 10 # High priority for title match
             
     # 2. Check Description Keywords
-    for category, data in KEYWORDS.items():
-        scores[category] += count_matches(job_description, data["skills"])
+    for category, hits in match_keywords(job_description, SKILL_INDEX, SKILL_OWNERS).items():
+        scores[category] += hits
         
     # Determine winner
     best_category = max(scores, key=scores.get)
     
     # If no matches at all, default to Associate (Resume 3) as per prompt
     if scores[best_category] == 0:
-        return "Associate"
+        return "ASSOCIATE"
         
     return best_category
+
+
+# BATCH SCORING
+# Every keyword is a column; a fixed keyword x category 0/1 matrix turns
+# per-job keyword counts into per-category scores with one matrix product.
+# The vocabulary is only ~100 keywords, so the count matrices stay small and dense.
+CATEGORIES = tuple(KEYWORDS)
+
+def _vocabulary(owners):
+    vocab = sorted(owners)
+    weights = np.zeros((len(vocab), len(CATEGORIES)), dtype=np.float32)
+    for i, kw in enumerate(vocab):
+        for category in owners[kw]:
+            weights[i, CATEGORIES.index(category)] = 1
+    return {kw: i for i, kw in enumerate(vocab)}, weights
+
+TITLE_VOCAB, TITLE_WEIGHTS = _vocabulary(TITLE_OWNERS)
+SKILL_VOCAB, SKILL_WEIGHTS = _vocabulary(SKILL_OWNERS)
+
+def _term_counts(texts, index, vocab):
+    counts = np.zeros((len(texts), len(vocab)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for kw, n in index.counts(normalize_text(text or "")).items():
+            counts[row, vocab[kw]] = n
+    return counts
+
+def score_jobs(jobs, weighting="presence"):
+    """
+    Scores many postings at once.
+    Returns a (len(jobs), len(CATEGORIES)) array of category scores.
+
+    weighting:
+      "presence" - 1 per distinct skill keyword (same scores as determine_resume_type)
+      "count"    - every occurrence counts
+      "tfidf"    - log term frequency weighted by rarity across this batch
+    A role-type match in the title adds 10 in every mode.
+    """
+    titles = _term_counts([j.get("Job_Title") for j in jobs], TITLE_INDEX, TITLE_VOCAB)
+    skills = _term_counts([j.get("Description") for j in jobs], SKILL_INDEX, SKILL_VOCAB)
+
+    if weighting == "presence":
+        skills = (skills > 0).astype(np.float32)
+    elif weighting == "tfidf":
+        doc_freq = (skills > 0).sum(axis=0)
+        idf = np.log((1 + len(jobs)) / (1 + doc_freq)) + 1
+        skills = np.log1p(skills) * idf
+    elif weighting != "count":
+        raise ValueError(f"Unknown weighting: {weighting}")
+
+    title_hits = ((titles > 0) @ TITLE_WEIGHTS) > 0
+    return 10 * title_hits.astype(np.float32) + skills @ SKILL_WEIGHTS
+
+def classify_jobs(jobs, weighting="presence"):
+    """
+    Batch version of determine_resume_type.
+    Returns (labels, scores) so callers can rank or threshold without re-scoring.
+    """
+    scores = score_jobs(jobs, weighting)
+    best = scores.argmax(axis=1) if len(jobs) else np.array([], dtype=int)
+    labels = [
+        CATEGORIES[b] if scores[row, b] > 0 else "ASSOCIATE"
+        for row, b in enumerate(best)
+    ]
+    return labels, scores
+
+
+# ROUTING
+_similarity_failed = False
+
+def reset():
+    """Retries resume similarity on the next scan after a failed load (the PDFs may have been fixed)."""
+    global _similarity_failed
+    _similarity_failed = False
+
+
+def select_resume_types(jobs, mode=MATCH_MODE):
+    """
+    Picks a resume for each job according to mode (see config.MATCH_MODE).
+    Falls back to keyword matching when the resume PDFs cannot be read.
+    """
+    global _similarity_failed
+    labels, scores = classify_jobs(jobs)
+    if mode == "keywords" or _similarity_failed or not jobs:
+        return labels
+
+    try:
+        texts = [f"{j.get('Job_Title', '')}\n{j.get('Description', '')}" for j in jobs]
+        categories, similarity = resume_similarity(texts)
+    except Exception as e:
+        print(f"Warning: Resume similarity unavailable, using keywords only: {e}")
+        _similarity_failed = True
+        return labels
+    if not categories:
+        return labels
+
+    by_similarity = [categories[i] for i in similarity.argmax(axis=1)]
+    if mode == "resume":
+        return by_similarity
+
+    # hybrid: similarity only replaces the "no keyword matched" default
+    return [
+        label if scores[row].max() > 0 else by_similarity[row]
+        for row, label in enumerate(labels)
+    ]
+
+def select_resume_type(job_title, job_description, mode=MATCH_MODE):
+    return select_resume_types([{"Job_Title": job_title, "Description": job_description}], mode)[0]
@@ -0,0 +1,307 @@
+"""
+Local stand-in for the PeopleAdmin job portal, for offline runs and benchmarks.
+
+Serves synthetic login, search, posting and application pages using the same
+ids, names and button texts the agent looks for (user_username,
+query_v0_posted_at_date, "Apply for this Job", "Add ... Entry" and so on).
+
+    python -m UBJob_Application_Agent.mock_portal --postings 100 --port 8010
+    UB_LOGIN_URL=http://127.0.0.1:8010/ UB_SEARCH_URL=http://127.0.0.1:8010/postings/search \\
+        python -m UBJob_Application_Agent.main
+"""
+import argparse
+import html
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+SESSION_COOKIE = "_portal_session"
+FIRST_POSTING_ID = 20000
+
+TITLES = [
+    "Data Analyst", "Research Scientist", "Administrative Assistant", "Data Engineer",
+    "Laboratory Technician", "Program Coordinator", "Business Intelligence Developer",
+    "Research Associate", "Student Services Specialist", "Machine Learning Engineer",
+    "Office Manager", "Process Engineer",
+]
+DEPARTMENTS = [
+    "Computer Science and Engineering", "Chemical and Biological Engineering",
+    "Enterprise Data Services", "Office of the Provost", "Student Life", "Research and Economic Development",
+]
+SENTENCES = [
+    "The successful candidate will work with Python, SQL and Tableau to support reporting.",
+    "Responsibilities include experimental design, microscopy and characterization of materials.",
+    "This role coordinates schedules, maintains records and supports faculty and staff.",
+    "Experience with machine learning, predictive modeling and data pipelines is preferred.",
+    "The position supports laboratory operations, synthesis and process optimization.",
+    "Strong communication skills and attention to detail are required.",
+    "The University at Buffalo is an equal opportunity employer.",
+    "Candidates should be comfortable presenting results to a non-technical audience.",
+    "Duties include customer service, event planning and budget tracking.",
+    "Publications in peer-reviewed journals are a plus.",
+]
+
+# Page weight the agent never needs, so resource blocking has something to save
+PAGE_ASSETS = """
+<link rel="stylesheet" href="/static/site.css">
+<link rel="stylesheet" href="https://fonts.portal-cdn.invalid/css?family=Open+Sans">
+<script src="https://analytics.portal-cdn.invalid/tag.js" async></script>
+<img src="/static/banner.png" alt="">
+"""
+STATIC = {
+    "/static/site.css": ("text/css", b"body { font-family: sans-serif; }\n" * 200),
+    "/static/banner.png": ("image/png", b"\x89PNG\r\n\x1a\n" + bytes(64 * 1024)),
+}
+
+ENTRY_FORMS = {
+    "education": ("Add Educational History Entry", """
+        <input id="SchoolName" name="entry[SchoolName]"> <input id="Major" name="entry[Major]">
+        <select id="Graduated" name="entry[Graduated]"><option></option><option>Yes</option><option>No</option></select>
+        <input id="Degree" name="entry[Degree]">"""),
+    "employment": ("Add Employment History Entry", """
+        <input id="EmployerName" name="entry[EmployerName]"> <input id="Phone" name="entry[Phone]">
+        <input id="Address" name="entry[Address]"> <input id="City" name="entry[City]">
+        <input id="Title" name="entry[Title]"> <textarea id="Duties" name="entry[Duties]"></textarea>
+        <input id="SupervisorName" name="entry[SupervisorName]">
+        <input id="ReasonForLeaving" name="entry[ReasonForLeaving]">
+        <input id="BeginDate" name="entry[BeginDate]"> <input id="EndDate" name="entry[EndDate]">"""),
+    "references": ("Add References Entry", """
+        <input id="Name" name="entry[Name]"> <input id="Email" name="entry[Email]">
+        <input id="Phone" name="entry[Phone]"> <textarea id="Relationship" name="entry[Relationship]"></textarea>"""),
+}
+
+# Words for the posting-specific sentences
+TOPICS = [
+    "grant", "survey", "dashboard", "curriculum", "spectroscopy", "inventory", "outreach", "compliance",
+    "genomics", "payroll", "admissions", "imaging", "forecasting", "procurement", "alumni", "catalysis",
+    "housing", "simulation", "accreditation", "telemetry", "archives", "recruitment", "assay", "licensing",
+    "scheduling", "polymers", "advising", "metadata", "sustainability", "robotics", "biostatistics", "events",
+]
+TASKS = ["lead", "document", "audit", "design", "review", "maintain", "coordinate", "analyze", "report on", "improve"]
+
+
+def make_postings(count, seed=0):
+    """Synthetic postings, newest (highest id) first, like the portal lists them."""
+    rng = random.Random(seed)
+    postings = []
+    for i in range(count):
+        title = rng.choice(TITLES)
+        # Shared sentences plus one made for this posting, so postings are not near-duplicates
+        paragraphs = [
+            " ".join(rng.choices(SENTENCES, k=5) + [_specific_sentence(rng)])
+            for _ in range(rng.randint(3, 8))
+        ]
+        postings.append({
+            "id": str(FIRST_POSTING_ID + count - i),
+            "title": f"{title} {i + 1}",
+            "department": rng.choice(DEPARTMENTS),
+            "description": paragraphs,
+        })
+    return postings
+
+
+def _specific_sentence(rng):
+    topics = rng.sample(TOPICS, 6)
+    return (f"You will {rng.choice(TASKS)} {topics[0]} and {topics[1]} work, {rng.choice(TASKS)} "
+            f"{topics[2]} projects with the {topics[3]} team, and {rng.choice(TASKS)} {topics[4]} "
+            f"and {topics[5]} records.")
+
+
+def _page(title, body, logged_in=True):
+    nav = '<a href="/logout">Logout</a> <span>Welcome, Applicant</span>' if logged_in else '<a href="/login">Login</a>'
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(title)} | UB Jobs</title>{PAGE_ASSETS}</head>
+<body><header><nav>{nav}</nav></header><main><h1>{html.escape(title)}</h1>{body}</main>
+<footer>University at Buffalo | Human Resources</footer></body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Set per server in start_portal
+    postings = []
+    by_id = {}
+    per_page = 100
+    latency = 0.0
+    sessions = set()
+    counts = {}
+    counts_lock = threading.Lock()
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        # Form fields and uploads are read and thrown away
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._route("POST")
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        if url.path in STATIC:
+            return self._send(200, *STATIC[url.path], {"Cache-Control": "max-age=3600"})
+
+        self._count(method, parts)
+        time.sleep(self.latency)
+
+        if parts == ["login"]:
+            return self._login(method)
+        if parts == ["logout"]:
+            return self._redirect("/", {"Set-Cookie": f"{SESSION_COOKIE}=; Path=/; Max-Age=0"})
+        if not parts:
+            return self._html(_page("Home", "<p>Search open positions.</p>", self._logged_in()))
+        if not self._logged_in():
+            return self._redirect("/login")
+        if parts == ["postings", "search"]:
+            return self._search(query)
+        if len(parts) >= 2 and parts[0] == "postings" and parts[1] in self.by_id:
+            posting = self.by_id[parts[1]]
+            if len(parts) == 2:
+                return self._posting(posting)
+            if parts[2:] == ["apply"]:
+                return self._application(posting, method)
+            if len(parts) == 4 and parts[2] == "apply" and parts[3] in ENTRY_FORMS:
+                return self._entry(posting, parts[3], method)
+        self._send(404, "text/plain", b"Not found")
+
+    def _count(self, method, parts):
+        if parts[:1] != ["postings"]:
+            kind = "/".join(parts) or "home"
+        elif parts[1:2] == ["search"]:
+            kind = "search"
+        else:
+            kind = "posting" if len(parts) == 2 else "apply"
+        with self.counts_lock:
+            key = f"{method} {kind}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _logged_in(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == SESSION_COOKIE and value in self.sessions:
+                return True
+        return False
+
+    def _login(self, method):
+        if method == "POST":
+            token = uuid.uuid4().hex
+            self.sessions.add(token)
+            return self._redirect("/", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+        form = """<form method="post" action="/login">
+            <label for="user_username">Username</label> <input id="user_username" name="user[username]">
+            <label for="user_password">Password</label> <input id="user_password" name="user[password]" type="password">
+            <input type="submit" value="Sign In"></form>"""
+        self._html(_page("Applicant Sign In", form, logged_in=False))
+
+    def _search(self, query):
+        page_num = max(1, int(query.get("page", ["1"])[0]))
+        start = (page_num - 1) * self.per_page
+        results = self.postings[start:start + self.per_page]
+        rows = "".join(
+            f'<tr><td><a href="/postings/{p["id"]}">{html.escape(p["title"])}</a></td>'
+            f'<td>{html.escape(p["department"])}</td>'
+            f'<td><a href="/postings/{p["id"]}">View Details</a></td></tr>'
+            for p in results
+        )
+        next_link = ""
+        if start + self.per_page < len(self.postings):
+            params = {k: v[0] for k, v in query.items()}
+            params["page"] = page_num + 1
+            next_link = f'<a class="next_page" rel="next" href="/postings/search?{urlencode(params)}">Next &rarr;</a>'
+        body = f"""<form method="get" action="/postings/search">
+            <select id="query_v0_posted_at_date" name="query[v_0][posted_at_date]">
+            <option value="">Any time</option><option value="day">Last Day</option><option value="week">Last Week</option>
+            </select> <input type="submit" value="Search"></form>
+            <table>{rows}</table><div class="pagination">{next_link}</div>"""
+        self._html(_page("Search Postings", body))
+
+    def _posting(self, posting):
+        etag = f'"{posting["id"]}-{posting.get("version", 1)}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, "text/html", b"", {"ETag": etag})
+        paragraphs = "".join(f"<p>{html.escape(p)}</p>" for p in posting["description"])
+        body = f"""<table><tr><th>Position Title</th><td>{html.escape(posting["title"])}</td></tr>
+            <tr><th>Department</th><td>{html.escape(posting["department"])}</td></tr></table>
+            <h2>Position Summary</h2>{paragraphs}
+            <a class="btn-apply" href="/postings/{posting["id"]}/apply">Apply for this Job</a>"""
+        self._html(_page(posting["title"], body), {"ETag": etag})
+
+    def _application(self, posting, method):
+        if method == "POST":
+            return self._html(_page("Application Submitted", "<p>Thank you for applying.</p>"))
+        personal = "".join(
+            f'<label>{name}</label> <input name="applicant[{name}]">'
+            for name in ("first_name", "last_name", "email", "phone", "address", "city", "zip")
+        )
+        entries = "".join(
+            f'<a href="/postings/{posting["id"]}/apply/{section}">{button}</a> '
+            for section, (button, _) in ENTRY_FORMS.items()
+        )
+        body = f"""<form method="post" enctype="multipart/form-data" action="/postings/{posting["id"]}/apply">
+            <fieldset>{personal}</fieldset><p>{entries}</p>
+            <table><tr><th>Resume</th><td><input type="file" name="resume"></td></tr>
+            <tr><th>Cover Letter</th><td><input type="file" name="cover_letter"></td></tr></table>
+            <input type="submit" value="Submit Application"></form>"""
+        self._html(_page(f"Apply: {posting['title']}", body))
+
+    def _entry(self, posting, section, method):
+        if method == "POST":
+            return self._redirect(f"/postings/{posting['id']}/apply")
+        button, fields = ENTRY_FORMS[section]
+        body = f"""<form method="post" action="/postings/{posting["id"]}/apply/{section}">{fields}
+            <button type="submit">Save</button></form>"""
+        self._html(_page(button.replace("Add ", ""), body))
+
+    def _html(self, text, headers=None):
+        self._send(200, "text/html; charset=utf-8", text.encode("utf-8"), headers)
+
+    def _redirect(self, location, headers=None):
+        self._send(303, "text/html", b"", dict(headers or {}, Location=location))
+
+    def _send(self, status, content_type, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output clean
+
+
+def start_portal(postings=100, per_page=100, latency=0.0, seed=0, host="127.0.0.1", port=0):
+    """
+    Starts the mock portal in a background thread.
+    Returns (server, base_url); server.RequestHandlerClass.counts holds the
+    number of requests per "METHOD kind". Call server.shutdown() when done.
+    """
+    generated = make_postings(postings, seed)
+    handler = type("PortalHandler", (_Handler,), {
+        "postings": generated, "by_id": {p["id"]: p for p in generated},
+        "per_page": per_page, "latency": latency, "sessions": set(), "counts": {},
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock PeopleAdmin job portal")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--postings", type=int, default=100)
+    parser.add_argument("--per-page", type=int, default=100, help="Postings per search results page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every page")
+    args = parser.parse_args()
+
+    server, base_url = start_portal(args.postings, args.per_page, args.latency, port=args.port)
+    print(f"Mock portal listening on {base_url}/ ({args.postings} postings, Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,135 @@
+"""
+Near-duplicate postings: UB often reposts a position under a new Job_ID.
+
+Each description gets a MinHash signature over its word shingles, stored in
+the job store with its LSH band buckets. A new posting is only compared with
+the jobs sharing at least one bucket (an indexed lookup, not a scan of the
+whole history), and counts as a copy when the estimated Jaccard similarity
+reaches NEAR_DUPLICATE_THRESHOLD.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from .config import (
+    NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, LSH_BANDS, SHINGLE_WORDS,
+)
+from .logger import batch
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+# Fixed, so signatures stay comparable between runs
+SEED = 20240611
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """crc32 hashes of the k-word shingles of text, as a uint64 array (empty for no words)."""
+    words = WORD_RE.findall((text or "").lower())
+    grams = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))} if words else set()
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, bands=LSH_BANDS, seed=SEED):
+        if permutations % bands:
+            raise ValueError(f"LSH_BANDS ({bands}) must divide MINHASH_PERMUTATIONS ({permutations})")
+        self.bands = bands
+        self.rows = permutations // bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2^64, top 32 bits; a odd
+        self._a = rng.integers(1, 2 ** 64 - 1, permutations, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64 - 1, permutations, dtype=np.uint64)
+
+    def signature(self, text):
+        """uint32 MinHash signature of text, or None if it has no words."""
+        hashes = shingles(text)
+        if not len(hashes):
+            return None
+        # (permutations, shingles); uint64 arithmetic wraps, which is the mod 2^64
+        mixed = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return mixed.min(axis=1).astype(np.uint32)
+
+    def buckets(self, signature):
+        """One signed 64-bit bucket key per band (the band number is part of the key)."""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8, person=band.to_bytes(2, "big")).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+class NearDuplicates:
+    """
+    Signature index kept in the job store (jobs.db), next to the jobs table:
+    minhashes holds one signature per Job_ID, plus what it was matched to and
+    the cover letter written for it; lsh_buckets maps band buckets to Job_IDs.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, hasher=None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.flagged = 0
+        with batch() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS minhashes (
+                       Job_ID TEXT PRIMARY KEY, Signature BLOB,
+                       Duplicate_Of TEXT, Similarity REAL, Cover_Letter TEXT)"""
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS lsh_buckets (Bucket INTEGER, Job_ID TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets (Bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS lsh_buckets_job ON lsh_buckets (Job_ID)")
+
+    def add(self, job):
+        """
+        Indexes the job's description and returns its closest earlier
+        near-duplicate as {"Job_ID", "Similarity", "Resume_Type", "Cover_Letter"},
+        or None if there is none above the threshold (or no description).
+        """
+        job_id = str(job["Job_ID"])
+        signature = self.hasher.signature(job.get("Description"))
+        if signature is None:
+            return None
+        buckets = self.hasher.buckets(signature)
+
+        with batch() as conn:
+            marks = ", ".join("?" for _ in buckets)
+            candidates = conn.execute(
+                f"""SELECT m.Job_ID, m.Signature, j.Resume_Type, m.Cover_Letter
+                    FROM minhashes m LEFT JOIN jobs j ON j.Job_ID = m.Job_ID
+                    WHERE m.Job_ID IN (SELECT Job_ID FROM lsh_buckets WHERE Bucket IN ({marks}))
+                      AND m.Job_ID != ?""",
+                [*buckets, job_id],
+            ).fetchall()
+
+            best = None
+            for other_id, blob, resume_type, cover_letter in candidates:
+                score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+                if score >= self.threshold and (best is None or score > best["Similarity"]):
+                    best = {"Job_ID": other_id, "Similarity": score,
+                            "Resume_Type": resume_type, "Cover_Letter": cover_letter}
+
+            # A changed posting replaces its old signature and buckets, but keeps its
+            # cover letter (INSERT OR REPLACE would drop it) for reposts to reuse
+            conn.execute("DELETE FROM lsh_buckets WHERE Job_ID = ?", (job_id,))
+            conn.execute(
+                """INSERT INTO minhashes (Job_ID, Signature, Duplicate_Of, Similarity) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (Job_ID) DO UPDATE SET Signature = excluded.Signature,
+                       Duplicate_Of = excluded.Duplicate_Of, Similarity = excluded.Similarity""",
+                (job_id, signature.tobytes(), best and best["Job_ID"], best and best["Similarity"]),
+            )
+            conn.executemany("INSERT INTO lsh_buckets (Bucket, Job_ID) VALUES (?, ?)",
+                             [(bucket, job_id) for bucket in buckets])
+        if best:
+            self.flagged += 1
+        return best
+
+    def record_letter(self, job_id, path):
+        """Remembers the cover letter used for a job, for its later reposts."""
+        with batch() as conn:
+            conn.execute("UPDATE minhashes SET Cover_Letter = ? WHERE Job_ID = ?", (path, str(job_id)))
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import queue
+import threading
+
+from .config import PIPELINE_QUEUE_SIZE
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+# How often blocked stages wake up to check for shutdown
+_POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _put(q, item, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return
+        except queue.Full:
+            pass
+
+
+def _get(q, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            pass
+
+
+def _classify_stage(classify, classify_q, generate_q, stop):
+    try:
+        while True:
+            job = _get(classify_q, stop)
+            if job is _DONE:
+                break
+            try:
+                if classify(job) is False:
+                    continue
+            except Exception as e:
+                print(f" -> Matching failed for {job.get('Job_ID')}: {e}")
+                continue
+            _put(generate_q, job, stop)
+        _put(generate_q, _DONE, stop)
+    except _Stopped:
+        pass
+
+
+def _generate_stage(generate_q, apply_q, personal_info, concurrency, stop):
+    # Imported here so importing the pipeline doesn't load the LLM client
+    from .generator import (
+        DEFAULT_CONCURRENCY,
+        generate_cover_letter_body_async,
+        generate_cover_letter_docx,
+        new_async_client,
+    )
+    if concurrency is None:
+        concurrency = DEFAULT_CONCURRENCY
+
+    async def generate(job, client, semaphore):
+        try:
+            body = await generate_cover_letter_body_async(
+                client, semaphore, job, job["Resume_Type"], personal_info
+            )
+            job["Cover_Letter"] = generate_cover_letter_docx(
+                job, job["Resume_Type"], personal_info, body_text=body
+            )
+            print(f" -> Cover Letter for {job['Job_ID']} saved to {job['Cover_Letter']}")
+        except Exception as e:
+            print(f" -> Cover letter for {job.get('Job_ID')} failed: {e}")
+            job["Cover_Letter"] = None
+        await loop.run_in_executor(None, _put, apply_q, job, stop)
+
+    async def run():
+        client = new_async_client()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Caps jobs taken off the queue, so backpressure reaches the earlier stages
+        slots = asyncio.Semaphore(max(1, concurrency))
+        tasks = set()
+
+        def finished(task):
+            tasks.discard(task)
+            slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                job = await loop.run_in_executor(None, _get, generate_q, stop)
+                if job is _DONE:
+                    break
+                cl_path = job.get("Cover_Letter")
+                if cl_path and os.path.exists(cl_path):
+                    slots.release()
+                    await loop.run_in_executor(None, _put, apply_q, job, stop)
+                    continue
+                task = asyncio.ensure_future(generate(job, client, semaphore))
+                tasks.add(task)
+                task.add_done_callback(finished)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            _put(apply_q, _DONE, stop)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await client.close()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    except _Stopped:
+        pass
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+def run_pipeline(discovered, classify, apply, personal_info,
+                 queue_size=PIPELINE_QUEUE_SIZE, concurrency=None):
+    """
+    Runs discover -> classify -> generate -> apply as overlapping stages joined
+    by bounded queues, so letters for later jobs are written while earlier
+    ones are being applied.
+
+    discovered: iterable of scraped jobs (e.g. scrape_jobs(...))
+    classify(job): sets job["Resume_Type"] and logs it; runs on its own thread.
+        Returning False drops the job (e.g. a skipped near-duplicate)
+    apply(job): applies to a job whose "Cover_Letter" is set (None if generation failed)
+    concurrency: LLM requests in flight (default: generator.DEFAULT_CONCURRENCY)
+
+    Discovery and application both drive the caller's browser page, and
+    Playwright's sync API only works from the thread that owns it, so the
+    calling thread alternates between those two: it applies ready jobs first
+    and only pulls the next posting while there is room downstream.
+    Returns the jobs that reached the apply stage.
+    """
+    classify_q = queue.Queue(maxsize=queue_size)
+    generate_q = queue.Queue(maxsize=queue_size)
+    apply_q = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    threads = [
+        threading.Thread(target=_classify_stage, args=(classify, classify_q, generate_q, stop),
+                         name="classify", daemon=True),
+        threading.Thread(target=_generate_stage, args=(generate_q, apply_q, personal_info, concurrency, stop),
+                         name="generate", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    finished = []
+
+    def apply_one(job):
+        apply(job)
+        finished.append(job)
+
+    def apply_ready():
+        # Apply everything already generated, without waiting
+        while True:
+            try:
+                job = apply_q.get_nowait()
+            except queue.Empty:
+                return
+            apply_one(job)
+
+    def enqueue(item):
+        while True:
+            try:
+                classify_q.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                # Downstream is busy; use the wait to apply
+                apply_ready()
+
+    try:
+        for job in discovered:
+            apply_ready()
+            enqueue(job)
+        enqueue(_DONE)
+
+        # Discovery is over; apply the rest as it comes in
+        while True:
+            if not any(t.is_alive() for t in threads) and apply_q.empty():
+                break
+            try:
+                job = apply_q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if job is _DONE:
+                break
+            apply_one(job)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+    return finished
@@ -0,0 +1,191 @@
+"""
+Append-only, compressed archive of every posting the scraper extracts, so
+matching and cover letter changes can be tried offline instead of scraping
+the portal again.
+
+postings.archive holds one frame per snapshot: a 4-byte magic, the payload
+length, then the zlib-compressed JSON record. Each record is compressed on
+its own, so one can be read back (through mmap) without decompressing the
+rest of the file. postings.archive.idx has a tab-separated line per frame:
+Job_ID, payload offset, payload length, fetch time and a hash of the
+extracted fields. A frame whose index line was lost (crash between the two
+writes) is re-indexed from the archive on the next open.
+
+    archive = PostingArchive()
+    archive.get("12345")          # latest snapshot of one posting
+    for job in archive:           # latest snapshot of every posting, in file order
+        ...
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from .config import ARCHIVE_FILE, ARCHIVE_COMPRESSION_LEVEL, ensure_dirs
+from .posting_cache import content_hash
+
+MAGIC = b"UBPA"
+HEADER = struct.Struct(">4sI")
+# Extracted fields kept per snapshot
+ARCHIVED_FIELDS = ("Job_ID", "Job_Title", "Department", "Description", "Link", "Deadline")
+
+
+def _fields_hash(job):
+    return content_hash("\n".join(str(job.get(k) or "") for k in ARCHIVED_FIELDS))[:16]
+
+
+class PostingArchive:
+    def __init__(self, path=ARCHIVE_FILE, level=ARCHIVE_COMPRESSION_LEVEL):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.level = level
+        self.appended = 0
+        # Scraper threads may append while the pipeline reads
+        self._lock = threading.Lock()
+        self._data = None
+        self._index_file = None
+        self._reader = None
+        self._mm = None
+        # Job_ID -> [(offset, length, fetched_at, hash)], oldest first
+        self._index = {}
+        self._load_index()
+
+    def _load_index(self):
+        indexed_end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        job_id, offset, length, fetched_at, digest = line.rstrip("\n").split("\t")
+                        entry = (int(offset), int(length), float(fetched_at), digest)
+                    except ValueError:
+                        # Half-written line from an interrupted run
+                        continue
+                    self._index.setdefault(job_id, []).append(entry)
+                    indexed_end = max(indexed_end, entry[0] + entry[1])
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size > indexed_end:
+            self._recover(indexed_end, size)
+
+    def _recover(self, start, end):
+        # Index frames written after the last index line
+        recovered = 0
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # The last indexed frame's payload ends where the next header starts
+            position = start
+            while position + HEADER.size <= end:
+                magic, length = HEADER.unpack_from(mm, position)
+                offset = position + HEADER.size
+                if magic != MAGIC or offset + length > end:
+                    print(f"Warning: Posting archive is truncated at byte {position}, ignoring the rest.")
+                    break
+                try:
+                    record = json.loads(zlib.decompress(mm[offset:offset + length]))
+                except (zlib.error, ValueError):
+                    break
+                self._write_index(str(record["Job_ID"]), offset, length,
+                                  record.get("Fetched_At", 0.0), _fields_hash(record))
+                recovered += 1
+                position = offset + length
+        if recovered:
+            print(f"Re-indexed {recovered} archived postings.")
+
+    def _write_index(self, job_id, offset, length, fetched_at, digest):
+        if self._index_file is None:
+            ensure_dirs()
+            self._index_file = open(self.index_path, "a+", encoding="utf-8")
+            # Start a fresh line after a half-written one
+            if self._index_file.tell():
+                self._index_file.seek(self._index_file.tell() - 1)
+                if self._index_file.read(1) != "\n":
+                    self._index_file.write("\n")
+        self._index_file.write(f"{job_id}\t{offset}\t{length}\t{fetched_at:.3f}\t{digest}\n")
+        self._index_file.flush()
+        self._index.setdefault(job_id, []).append((offset, length, fetched_at, digest))
+
+    def append(self, job, fetched_at=None):
+        """
+        Adds a snapshot of the job. Nothing is written when its fields match
+        the posting's latest snapshot. Returns True if a snapshot was added.
+        """
+        job_id = str(job["Job_ID"])
+        digest = _fields_hash(job)
+        record = {k: job[k] for k in ARCHIVED_FIELDS if job.get(k) is not None}
+        record["Job_ID"] = job_id
+        record["Fetched_At"] = fetched_at or time.time()
+        payload = zlib.compress(json.dumps(record).encode("utf-8"), self.level)
+
+        with self._lock:
+            history = self._index.get(job_id)
+            if history and history[-1][3] == digest:
+                return False
+            if self._data is None:
+                ensure_dirs()
+                self._data = open(self.path, "ab")
+            self._data.write(HEADER.pack(MAGIC, len(payload)) + payload)
+            self._data.flush()
+            # Index after the data, so a crash leaves at most an unindexed frame
+            self._write_index(job_id, self._data.tell() - len(payload), len(payload),
+                              record["Fetched_At"], digest)
+            self.appended += 1
+        return True
+
+    def _read(self, entry):
+        offset, length = entry[0], entry[1]
+        with self._lock:
+            if self._mm is None or len(self._mm) < offset + length:
+                # The file grew since it was mapped
+                if self._mm is not None:
+                    self._mm.close()
+                if self._reader is None:
+                    self._reader = open(self.path, "rb")
+                self._mm = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+            payload = self._mm[offset:offset + length]
+        return json.loads(zlib.decompress(payload))
+
+    def get(self, job_id):
+        """Latest snapshot of a posting, or None."""
+        history = self._index.get(str(job_id))
+        return self._read(history[-1]) if history else None
+
+    def history(self, job_id):
+        """Every snapshot of a posting, oldest first."""
+        return [self._read(entry) for entry in self._index.get(str(job_id), [])]
+
+    def records(self, latest_only=True):
+        """
+        Yields archived snapshots in file order (one sequential pass over the
+        archive); latest_only keeps only each posting's newest snapshot.
+        """
+        with self._lock:
+            if latest_only:
+                entries = [history[-1] for history in self._index.values()]
+            else:
+                entries = [entry for history in self._index.values() for entry in history]
+        for entry in sorted(entries):
+            yield self._read(entry)
+
+    def __iter__(self):
+        return self.records()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, job_id):
+        return str(job_id) in self._index
+
+    def report(self):
+        snapshots = sum(len(history) for history in self._index.values())
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return (f"Posting archive: {len(self._index)} postings, {snapshots} snapshots, "
+                f"{size / 1024 / 1024:.1f} MB ({self.appended} added this run).")
+
+    def close(self):
+        with self._lock:
+            for handle in (self._mm, self._reader, self._data, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._mm = self._reader = self._data = self._index_file = None
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from .config import POSTING_CACHE_FILE, POSTING_CACHE_TTL_HOURS, POSTING_CACHE_MAX_ENTRIES
+
+# Extracted fields kept per posting, plus what later phases decided about it
+CACHED_FIELDS = ("Job_Title", "Department", "Description", "Resume_Type", "Cover_Letter")
+
+
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def job_from_entry(job_id, link, entry):
+    """Rebuilds the scraped job dict from a cache entry, flagged as unchanged."""
+    job = {k: entry[k] for k in CACHED_FIELDS if k in entry}
+    job.update({"Job_ID": job_id, "Link": link, "Unchanged": True})
+    return job
+
+
+class PostingCache:
+    """
+    On-disk cache of scraped postings keyed by Job_ID.
+
+    Each entry holds the extracted fields, a hash of the raw page, the fetch
+    time and the HTTP validators (ETag / Last-Modified) the portal sent.
+    Entries older than the TTL are dropped and the file is capped at
+    max_entries, keeping the most recently fetched postings.
+    """
+
+    def __init__(self, path=POSTING_CACHE_FILE, ttl_hours=POSTING_CACHE_TTL_HOURS,
+                 max_entries=POSTING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Scraper threads read and write the cache concurrently
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read posting cache, starting empty: {e}")
+        self._evict()
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self._entries.get(str(job_id))
+            if entry and time.time() - entry["Fetched_At"] > self.ttl_seconds:
+                return None
+            return dict(entry) if entry else None
+
+    def __contains__(self, job_id):
+        """True when a posting has an entry still inside the TTL."""
+        with self._lock:
+            entry = self._entries.get(str(job_id))
+            return bool(entry) and time.time() - entry["Fetched_At"] <= self.ttl_seconds
+
+    def validators(self, job_id):
+        """Conditional request headers for a posting we already have."""
+        entry = self.get(job_id)
+        headers = {}
+        if entry:
+            if entry.get("ETag"):
+                headers["If-None-Match"] = entry["ETag"]
+            if entry.get("Last_Modified"):
+                headers["If-Modified-Since"] = entry["Last_Modified"]
+        return headers
+
+    def lookup(self, job_id, page_hash, etag=None, last_modified=None):
+        """
+        Returns the cached entry when the page content is unchanged
+        (same hash), otherwise None.
+        """
+        entry = self.get(job_id)
+        if entry and entry.get("Content_Hash") == page_hash:
+            self.touch(job_id, etag, last_modified)
+            return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def touch(self, job_id, etag=None, last_modified=None):
+        # Page confirmed unchanged (same hash or HTTP 304); restart its TTL
+        with self._lock:
+            entry = self._entries.get(str(job_id))
+            if not entry:
+                return
+            self.hits += 1
+            entry["Fetched_At"] = time.time()
+            if etag:
+                entry["ETag"] = etag
+            if last_modified:
+                entry["Last_Modified"] = last_modified
+
+    def put(self, job, page_hash, etag=None, last_modified=None):
+        entry = {k: job[k] for k in CACHED_FIELDS if k in job}
+        entry.update({
+            "Content_Hash": page_hash,
+            "Fetched_At": time.time(),
+            "ETag": etag,
+            "Last_Modified": last_modified,
+        })
+        with self._lock:
+            self._entries[str(job["Job_ID"])] = entry
+
+    def annotate(self, job_id, **fields):
+        """Records downstream results (Resume_Type, Cover_Letter) on a cached posting."""
+        with self._lock:
+            entry = self._entries.get(str(job_id))
+            if entry:
+                entry.update(fields)
+
+    def save(self):
+        self._evict()
+        with self._lock:
+            data = json.dumps(self._entries)
+        # Write to a temp file and swap it in, so a crash never leaves half a cache
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _evict(self):
+        now = time.time()
+        with self._lock:
+            fresh = {
+                job_id: entry for job_id, entry in self._entries.items()
+                if now - entry.get("Fetched_At", 0) <= self.ttl_seconds
+            }
+            if len(fresh) > self.max_entries:
+                newest = sorted(fresh.items(), key=lambda kv: kv[1]["Fetched_At"], reverse=True)
+                fresh = dict(newest[:self.max_entries])
+            self._entries = fresh
@@ -0,0 +1,133 @@
+import threading
+import time
+from urllib.parse import urlparse
+from .config import LOGIN_URL, RESOURCE_PROFILE, RESOURCE_PROFILES, RESOURCE_PHASE_ALLOW, RESOURCE_ALLOWED_HOSTS
+
+
+class ResourceFilter:
+    """
+    Aborts requests the agent never needs (images, fonts, third-party
+    analytics...) for every page of the contexts it is installed on.
+
+    What gets blocked comes from a profile in RESOURCE_PROFILES. Pages that
+    break without something get a per-phase allow-list (RESOURCE_PHASE_ALLOW):
+    each entry is a resource type or a host, "*" allowing every host. The
+    phase is set per context at install time and can be overridden per page.
+    Navigations are never blocked.
+
+    Counts blocked requests and, per phase, the pages loaded, the bytes they
+    received and the time from navigation to load. Bytes only come from
+    Content-Length, so chunked responses count as 0 and the figure is a lower
+    bound.
+    """
+
+    def __init__(self, profile=RESOURCE_PROFILE, phase_allow=RESOURCE_PHASE_ALLOW,
+                 allowed_hosts=RESOURCE_ALLOWED_HOSTS):
+        self.blocked_types = set(RESOURCE_PROFILES[profile])
+        self.block_third_party = "third-party" in self.blocked_types
+        self.phase_allow = {phase: set(allow) for phase, allow in phase_allow.items()}
+        self.first_party = {urlparse(LOGIN_URL).hostname} | set(allowed_hosts)
+        self._context_phase = {}
+        self._page_phase = {}
+        self._nav_start = {}
+        self._lock = threading.Lock()
+        self.blocked = {}
+        self.pages = {}
+
+    def install(self, context, phase=None):
+        """Routes every request of the context through the filter."""
+        self._context_phase[context] = phase
+        context.on("page", self._watch)
+        context.on("close", lambda _: self._context_phase.pop(context, None))
+        if self.blocked_types:
+            context.route("**/*", self._handle)
+
+    def set_phase(self, page, phase):
+        if page not in self._page_phase:
+            page.on("close", lambda _: self._forget(page))
+        self._page_phase[page] = phase
+
+    def _phase(self, page):
+        if page in self._page_phase:
+            return self._page_phase[page]
+        return self._context_phase.get(page.context)
+
+    def _is_first_party(self, host):
+        return any(host == h or host.endswith("." + h) for h in self.first_party)
+
+    def _handle(self, route):
+        request = route.request
+        if request.is_navigation_request():
+            return route.continue_()
+        try:
+            phase = self._phase(request.frame.page)
+        except Exception:
+            # Service worker requests have no page
+            phase = None
+        allow = self.phase_allow.get(phase, ())
+        kind = request.resource_type
+        host = urlparse(request.url).hostname or ""
+        if kind in self.blocked_types and kind not in allow:
+            return self._abort(route, kind)
+        if self.block_third_party and not self._is_first_party(host) and host not in allow and "*" not in allow:
+            return self._abort(route, "third-party")
+        route.continue_()
+
+    def _abort(self, route, reason):
+        with self._lock:
+            self.blocked[reason] = self.blocked.get(reason, 0) + 1
+        route.abort()
+
+    def _watch(self, page):
+        page.on("request", lambda request: self._on_request(page, request))
+        page.on("response", lambda response: self._on_response(page, response))
+        page.on("load", lambda _: self._on_load(page))
+        page.on("close", lambda _: self._forget(page))
+
+    def _stats(self, page):
+        phase = self._phase(page) or "other"
+        return self.pages.setdefault(phase, {"pages": 0, "bytes": 0, "load_seconds": 0.0})
+
+    def _on_request(self, page, request):
+        if request.is_navigation_request() and request.frame == page.main_frame:
+            self._nav_start[page] = time.perf_counter()
+
+    def _on_response(self, page, response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            with self._lock:
+                self._stats(page)["bytes"] += int(length)
+
+    def _on_load(self, page):
+        start = self._nav_start.pop(page, None)
+        if start is None:
+            return
+        with self._lock:
+            stats = self._stats(page)
+            stats["pages"] += 1
+            stats["load_seconds"] += time.perf_counter() - start
+
+    def _forget(self, page):
+        self._page_phase.pop(page, None)
+        self._nav_start.pop(page, None)
+
+    def reset(self):
+        """Zeroes the counters, so each scan's report covers that scan only."""
+        with self._lock:
+            self.blocked = {}
+            self.pages = {}
+
+    def report(self):
+        with self._lock:
+            blocked = sum(self.blocked.values())
+            by_reason = ", ".join(f"{k}: {v}" for k, v in sorted(self.blocked.items()))
+            lines = [f"Blocked {blocked} requests" + (f" ({by_reason})" if by_reason else "") + "."]
+            for phase, stats in sorted(self.pages.items()):
+                n = stats["pages"] or 1
+                lines.append(f" - {phase}: {stats['pages']} pages, "
+                             f">= {stats['bytes'] / n / 1024:.0f} KB/page (Content-Length only), "
+                             f"{stats['load_seconds'] / n * 1000:.0f} ms/page load")
+        return "\n".join(lines)
+
+
+resource_filter = ResourceFilter()
@@ -0,0 +1,95 @@
+import os
+import re
+import zlib
+
+import numpy as np
+from .config import RESUME_PATHS, RESUME_VECTORS_FILE
+
+# 2^14 hashed features: plenty for three resumes, small enough to batch many jobs
+N_FEATURES = 2 ** 14
+BATCH_SIZE = 256
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def _features(text):
+    # Unigrams and bigrams; crc32 keeps the hashing stable between runs
+    tokens = TOKEN_RE.findall((text or "").lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for gram in grams:
+        h = zlib.crc32(gram.encode("utf-8"))
+        # One hash bit picks the sign, so collisions tend to cancel out
+        yield h % N_FEATURES, (1.0 if h & 0x80000000 else -1.0)
+
+
+def vectorize(texts):
+    """Hashing vectorizer: (len(texts), N_FEATURES) float32 rows, log-tf, L2-normalized."""
+    matrix = np.zeros((len(texts), N_FEATURES), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for col, sign in _features(text):
+            matrix[row, col] += sign
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def extract_pdf_text(path):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def load_resume_vectors(resume_paths=RESUME_PATHS, cache_path=RESUME_VECTORS_FILE):
+    """
+    Returns (categories, matrix) with one L2-normalized row per resume.
+    Vectors are cached on disk and rebuilt only when a resume's mtime changes.
+    """
+    categories = sorted(name for name, path in resume_paths.items() if os.path.exists(path))
+    mtimes = np.array([os.path.getmtime(resume_paths[c]) for c in categories])
+
+    if os.path.exists(cache_path):
+        try:
+            cached = np.load(cache_path)
+            if (list(cached["categories"]) == categories
+                    and np.array_equal(cached["mtimes"], mtimes)
+                    and cached["vectors"].shape[1] == N_FEATURES):
+                return categories, cached["vectors"]
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable resume vector cache: {e}")
+
+    print(f"Vectorizing {len(categories)} resumes...")
+    vectors = vectorize([extract_pdf_text(resume_paths[c]) for c in categories])
+    # np.savez appends .npz unless it is already there
+    np.savez(cache_path, categories=np.array(categories), mtimes=mtimes, vectors=vectors)
+    return categories, vectors
+
+
+# (resume mtimes, (categories, vectors)): reloaded when a resume is added, removed or
+# replaced, so a long-running daemon never matches against stale vectors
+_resume_vectors = None
+
+
+def _resume_mtimes(resume_paths=RESUME_PATHS):
+    return tuple(sorted(
+        (name, os.path.getmtime(path)) for name, path in resume_paths.items() if os.path.exists(path)
+    ))
+
+
+def resume_similarity(texts):
+    """
+    Cosine similarity of each text to each resume.
+    Returns (categories, scores) with scores shaped (len(texts), len(categories)).
+    """
+    global _resume_vectors
+    mtimes = _resume_mtimes()
+    if _resume_vectors is None or _resume_vectors[0] != mtimes:
+        _resume_vectors = (mtimes, load_resume_vectors())
+    categories, resumes = _resume_vectors[1]
+
+    scores = np.zeros((len(texts), len(categories)), dtype=np.float32)
+    # Batched so the dense job matrix stays a few MB
+    for start in range(0, len(texts), BATCH_SIZE):
+        chunk = vectorize(texts[start:start + BATCH_SIZE])
+        scores[start:start + BATCH_SIZE] = chunk @ resumes.T
+    return categories, scores
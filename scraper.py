@@ -1,25 +1,109 @@
 from playwright.sync_api import sync_playwright
 import time
-from .config import HEADLESS
-from .logger import log_job
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from .config import HEADLESS, SCRAPE_CONCURRENCY, SCRAPE_BACKEND, MAX_SEARCH_PAGES, SEARCH_URL
+from .description import clean_description
+from .http_scraper import build_session, fetch_posting
+from .logger import log_job, known_job_ids
+from .posting_cache import content_hash, job_from_entry
+from .tracing import span, annotate
+from .workers import PageWorkers
 
-SEARCH_URL = "https://www.ubjobs.buffalo.edu/postings/search"
+def scrape_jobs(page, concurrency=SCRAPE_CONCURRENCY, backend=SCRAPE_BACKEND,
+                known_ids=None, max_pages=MAX_SEARCH_PAGES, cache=None, archive=None):
+    """
+    Walks the search results page by page and yields one scraped posting at a
+    time, so matching and generation can start before discovery is finished.
 
-def scrape_jobs(page):
-    print(f"Navigating to {SEARCH_URL}...")
-    page.goto(SEARCH_URL)
-    page.wait_for_load_state("networkidle")
-    
-    # Apply "Last Week" filter
-    print("Applying 'Last Week' date filter...")
-    try:
-        page.select_option("select#query_v0_posted_at_date", "week")
-        page.click("input[type='submit'][value='Search'], button:has-text('Search')")
+    Postings already in the job log are skipped, and paging stops at the first
+    results page that has nothing new on it (results are newest first).
+    With a PostingCache, postings whose page has not changed are returned from
+    the cache with "Unchanged" set instead of being extracted again. Logged
+    postings still in the cache are re-checked (a conditional request on the
+    HTTP path): unchanged ones are dropped, edited ones come back with
+    "Updated" set so they get matched again.
+    With a PostingArchive, every posting is also archived (a snapshot is only
+    added when its fields changed).
+    """
+    if known_ids is None:
+        known_ids = known_job_ids()
+
+    with span("search", page_num=0):
+        print(f"Navigating to {SEARCH_URL}...")
+        page.goto(SEARCH_URL)
         page.wait_for_load_state("networkidle")
-        print("Filter applied.")
-    except Exception as e:
-        print(f"Warning: Could not apply date filter: {e}")
 
+        # Apply "Last Week" filter
+        print("Applying 'Last Week' date filter...")
+        try:
+            page.select_option("select#query_v0_posted_at_date", "week")
+            page.click("input[type='submit'][value='Search'], button:has-text('Search')")
+            page.wait_for_load_state("networkidle")
+            print("Filter applied.")
+        except Exception as e:
+            print(f"Warning: Could not apply date filter: {e}")
+
+    # Detail-page browsers start once per scan and serve every results page;
+    # their contexts start from this context's cookies, so they are already logged in
+    workers = None
+    if concurrency > 1:
+        workers = PageWorkers(page.context.storage_state(), concurrency, phase="detail")
+    try:
+        seen_ids = set()
+        for page_num in range(1, max_pages + 1):
+            with span("search", page_num=page_num) as s:
+                unique_jobs = _collect_postings(page)
+                # Read the next link now, detail scraping may navigate this page away
+                next_url = _next_page_url(page)
+
+                unseen = {job_id: info for job_id, info in unique_jobs.items() if job_id not in seen_ids}
+                new = [(job_id, info) for job_id, info in unseen.items() if job_id not in known_ids]
+                # Logged postings fetched within the cache TTL: cheap to ask whether they changed
+                recheck = [
+                    (job_id, info) for job_id, info in unseen.items()
+                    if job_id in known_ids and cache is not None and job_id in cache
+                ]
+                targets = new + recheck
+                s.set(postings=len(unique_jobs), new=len(new), recheck=len(recheck))
+            seen_ids.update(unique_jobs)
+            print(f"Results page {page_num}: {len(unique_jobs)} postings, {len(new)} new, "
+                  f"{len(recheck)} to re-check.")
+
+            if targets:
+                if backend == "http":
+                    scraped = _scrape_with_http(page, targets, concurrency, cache, workers)
+                else:
+                    scraped = _scrape_with_browser(page, targets, concurrency, cache, workers)
+                try:
+                    for job in scraped:
+                        if archive is not None:
+                            archive.append(job)
+                        if job["Job_ID"] in known_ids:
+                            if job.get("Unchanged"):
+                                continue
+                            job["Updated"] = True
+                            print(f" -> {job['Job_ID']} changed since it was logged, matching it again.")
+                        yield job
+                finally:
+                    # Stop fetching even if the caller stops early
+                    scraped.close()
+
+            if not new:
+                if unique_jobs:
+                    print("Nothing new on this page, stopping discovery.")
+                break
+            if not next_url:
+                break
+            with span("search.next_page", page_num=page_num + 1):
+                page.goto(next_url)
+                page.wait_for_load_state("domcontentloaded")
+    finally:
+        if workers:
+            workers.close()
+
+
+def _collect_postings(page):
     # Find all job links and titles from the search page
     # This is more reliable than the detail page header for titles
     jobs_found = page.eval_on_selector_all(
@@ -48,49 +132,110 @@ def scrape_jobs(page):
                 unique_jobs[job_id] = job
         else:
             unique_jobs[job_id] = job
-            
-    print(f"Found {len(unique_jobs)} potential job postings.")
-    
-    new_jobs = []
-    
-    # Limit to 10 for testing, will increase for the real testing
-    for job_id, job_info in list(unique_jobs.items())[:10]:
-        link = job_info['href']
-        title = job_info['title']
-        
+
+    return unique_jobs
+
+
+def _next_page_url(page):
+    # PeopleAdmin search results use will_paginate: <a class="next_page" rel="next">
+    return page.evaluate(
+        """() => {
+            const a = document.querySelector("a.next_page, a[rel='next']");
+            return a ? a.href : null;
+        }"""
+    )
+
+
+def _scrape_with_http(page, targets, concurrency, cache=None, workers=None):
+    session = build_session(page, concurrency)
+    fallback = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            # pool.map hands results back in order as soon as each one is ready
+            for target, job in zip(targets, pool.map(lambda t: fetch_posting(session, t, cache), targets)):
+                if job:
+                    yield job
+                else:
+                    fallback.append(target)
+    finally:
+        session.close()
+
+    # Anything the HTTP path could not read goes through the browser instead
+    if fallback:
+        print(f"{len(fallback)} postings need the browser, falling back...")
+        yield from _scrape_with_browser(page, fallback, concurrency, cache, workers)
+
+
+def _scrape_with_browser(page, targets, concurrency, cache=None, workers=None):
+    if workers and len(targets) > 1:
+        print(f"Scraping {len(targets)} postings with {concurrency} parallel pages...")
+        results = workers.imap(targets, partial(_scrape_posting, cache=cache))
+    else:
+        results = (_scrape_posting(page, target, cache) for target in targets)
+
+    # Failed postings come back as None
+    for job in results:
+        if job:
+            yield job
+
+
+def _scrape_posting(page, target, cache=None):
+    job_id, job_info = target
+    with span("detail", job_id=job_id, backend="browser") as s:
+        job = _extract_posting(page, target, cache)
+        s.set(found=job is not None, unchanged=bool(job and job.get("Unchanged")))
+        return job
+
+
+def _extract_posting(page, target, cache=None):
+    job_id, job_info = target
+    link = job_info['href']
+    title = job_info['title']
+
+    try:
+        print(f"Scraping {link}...")
+        response = page.goto(link)
+        page.wait_for_load_state("domcontentloaded")
+
+        # Unchanged page: reuse what we extracted last time
+        html = page.content()
+        annotate(bytes=len(html))
+        page_hash = content_hash(html)
+        etag = response.headers.get("etag") if response else None
+        last_modified = response.headers.get("last-modified") if response else None
+        if cache:
+            entry = cache.lookup(job_id, page_hash, etag, last_modified)
+            if entry:
+                return job_from_entry(job_id, link, entry)
+
+        # Department
+        # Try to find a field labeled "Department"
+        department = "Unknown"
+        # Common pattern in PeopleAdmin: <span class="label">Department</span> <span class="value">...</span>
+        # We'll try a few strategies
         try:
-            print(f"Scraping {link}...")
-            page.goto(link)
-            page.wait_for_load_state("domcontentloaded")
-            
-            # Department
-            # Try to find a field labeled "Department"
-            department = "Unknown"
-            # Common pattern in PeopleAdmin: <span class="label">Department</span> <span class="value">...</span>
-            # We'll try a few strategies
-            try:
-                # Strategy 1: Look for table row or list item
-                dept_el = page.query_selector("tr:has-text('Department') td:nth-child(2)") or \
-                          page.query_selector("li:has-text('Department') span.value")
-                if dept_el:
-                    department = dept_el.inner_text().strip()
-            except:
-                pass
-            
-            # Description
-            description = page.inner_text("body")
-            
-            job_data = {
-                "Job_ID": job_id,
-                "Job_Title": title,
-                "Department": department,
-                "Description": description,
-                "Link": link
-            }
-            
-            new_jobs.append(job_data)
-            
-        except Exception as e:
-            print(f"Error scraping {link}: {e}")
-            
-    return new_jobs
+            # Strategy 1: Look for table row or list item
+            dept_el = page.query_selector("tr:has-text('Department') td:nth-child(2)") or \
+                      page.query_selector("li:has-text('Department') span.value")
+            if dept_el:
+                department = dept_el.inner_text().strip()
+        except:
+            pass
+
+        # Description, without the portal's navigation and footer
+        description = clean_description(page.inner_text("body"))
+
+        job_data = {
+            "Job_ID": job_id,
+            "Job_Title": title,
+            "Department": department,
+            "Description": description,
+            "Link": link
+        }
+        if cache:
+            cache.put(job_data, page_hash, etag, last_modified)
+        return job_data
+
+    except Exception as e:
+        print(f"Error scraping {link}: {e}")
+        return None
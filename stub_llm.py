@@ -0,0 +1,107 @@
+"""
+Local stand-in for the OpenAI Responses API, for offline runs and benchmarks.
+
+    python -m UBJob_Application_Agent.stub_llm --port 8011 --latency 2
+    OPENAI_BASE_URL=http://127.0.0.1:8011/v1 OPENAI_API_KEY=stub python -m UBJob_Application_Agent.main
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_BODY = (
+    "I am excited to apply for this position. My background in analysis, research "
+    "and coordination matches the needs described in the posting.\n\n"
+    "In my recent roles I delivered measurable results and worked closely with "
+    "faculty, staff and students.\n\n"
+    "Thank you for your consideration. I look forward to discussing the role."
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Set per server in start_stub_server
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    calls = 0
+    calls_lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.calls_lock:
+            type(self).calls += 1
+
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if not self.path.rstrip("/").endswith("/responses"):
+            return self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+        if random.random() < self.error_rate:
+            return self._send(429, {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit"}},
+                              {"retry-after": "0.1"})
+
+        self._send(200, {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": request.get("model", "stub"),
+            "output": [{
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": STUB_BODY, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output clean
+
+
+def start_stub_server(latency=1.0, jitter=0.0, error_rate=0.0, host="127.0.0.1", port=0):
+    """
+    Starts the stub in a background thread.
+    Returns (server, base_url); pass base_url as OPENAI_BASE_URL and call
+    server.shutdown() when done. port=0 picks a free port.
+    """
+    handler = type("StubHandler", (_Handler,), {
+        "latency": latency, "jitter": jitter, "error_rate": error_rate, "calls": 0,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenAI Responses API")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"Stub LLM listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
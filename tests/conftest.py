@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+import pytest
+
+# config reads UB_DATA_DIR at import; point it away from the tracked logs/ before any test imports it
+os.environ.setdefault("UB_DATA_DIR", tempfile.mkdtemp(prefix="ub-tests-"))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """An empty job store (and CSV export path) in tmp_path."""
+    from .. import logger
+    logger.close()
+    monkeypatch.setattr(logger, "DB_FILE", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(logger, "LOG_FILE", str(tmp_path / "jobs_log.csv"))
+    logger._pending.clear()
+    yield logger
+    logger.close()
+    logger._pending.clear()
@@ -0,0 +1,16 @@
+from ..auth import is_logged_in
+
+
+def test_logged_in_pages():
+    assert is_logged_in('<nav><a href="/logout">Logout</a> <span>Welcome, Applicant</span></nav>')
+    assert is_logged_in('<a href="/sign_out">Log Out</a>')
+    # Only a greeting, as some portal pages show after login
+    assert is_logged_in("<span>Welcome back, Prabhu</span>")
+
+
+def test_logged_out_pages():
+    assert not is_logged_in('<a href="/login">Login</a>')
+    assert not is_logged_in('<h1>Welcome to UB Jobs</h1> <a href="/login">Log In</a>')
+    # The login form wins over anything else on the page
+    assert not is_logged_in('<span>Welcome</span><input id="user_username"> <a>Logout</a>')
+    assert not is_logged_in("")
@@ -0,0 +1,57 @@
+from ..description import clean_description, truncate_to_tokens
+
+
+def test_duties_mentioning_accommodation_are_kept():
+    raw = ("Essential Functions\n"
+           "Perform the essential functions with or without reasonable accommodation, "
+           "including operating the SEM and XRD instruments.\n"
+           "Other")
+    assert clean_description(raw) == raw
+
+
+def test_only_the_eeo_sentence_is_dropped_from_a_paragraph():
+    raw = ("Position Summary\n"
+           "The role supports reporting in Python and SQL. "
+           "The University at Buffalo is an equal opportunity employer. "
+           "Strong communication skills are required.\n"
+           "Contact HR to request a reasonable accommodation.")
+    assert clean_description(raw) == (
+        "Position Summary\n"
+        "The role supports reporting in Python and SQL. Strong communication skills are required."
+    )
+
+
+def test_navigation_and_repeated_paragraphs_are_dropped():
+    paragraph = "Responsibilities include experimental design and characterization of materials."
+    raw = f"Home\nSearch Jobs\nPosition Summary\n{paragraph}\nYes\nYes\n{paragraph}\nApply for this Job"
+    assert clean_description(raw) == f"Position Summary\n{paragraph}\nYes\nYes"
+
+
+def test_stops_at_the_application_section():
+    raw = "Duties\nRun the lab.\nSupplemental Questions\nRequired fields are indicated with an asterisk."
+    assert clean_description(raw) == "Duties\nRun the lab."
+
+
+def test_footer_copyright_line_ends_the_posting():
+    raw = "Duties\nRun the lab.\n© 2025 University at Buffalo. All rights reserved.\nPrivacy\nAccessibility"
+    assert clean_description(raw) == "Duties\nRun the lab."
+    raw = "Duties\nRun the lab.\nCopyright (c) 2024-2025 The State University of New York"
+    assert clean_description(raw) == "Duties\nRun the lab."
+
+
+def test_copyright_in_the_body_is_content():
+    body = [
+        "Position Summary",
+        "Copyright 2024 guidance for faculty is part of this role.",
+        "Advise on copyright, licensing and fair use for library collections.",
+    ] + [f"Duty number {i} of the scholarly communication librarian." for i in range(10)]
+    raw = "\n".join(body)
+    # The first line matches the notice pattern but is far from the page footer
+    assert clean_description(raw) == raw
+
+
+def test_truncate_to_tokens_prefers_a_line_break():
+    text = "a" * 30 + "\n" + "b" * 30
+    assert truncate_to_tokens(text, 10) == "a" * 30
+    assert truncate_to_tokens("short", 10) == "short"
+    assert len(truncate_to_tokens("x" * 100, 5)) == 20
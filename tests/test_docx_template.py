@@ -0,0 +1,88 @@
+import os
+
+from docx import Document
+
+from ..docx_template import CompiledTemplate, default_layout, get_template
+
+
+def texts(path):
+    return [p.text for p in Document(str(path)).paragraphs]
+
+
+def test_default_layout_fills_every_slot(tmp_path):
+    template = CompiledTemplate(default_layout())
+    assert {"FULL_NAME", "BODY", "DEPARTMENT", "DATE"} <= template.placeholders
+    out = tmp_path / "letter.docx"
+    template.render({"FULL_NAME": "Ada Lovelace", "DEPARTMENT": "Research & Economic Development",
+                     "BODY": "First paragraph.\n\nSecond <paragraph>."}, str(out))
+    paragraphs = texts(out)
+    assert paragraphs[0] == "Ada Lovelace" and paragraphs[-1] == "Ada Lovelace"
+    assert "Research & Economic Development" in paragraphs
+    # Block slot: one paragraph per non-empty line, XML characters escaped
+    body = paragraphs.index("First paragraph.")
+    assert paragraphs[body + 1] == "Second <paragraph>."
+    # Unknown or missing values render empty
+    assert "{{" not in "".join(paragraphs)
+
+
+def test_block_slot_bullets_and_empty_value(tmp_path):
+    doc = Document()
+    for text in ["Intro", "{{SKILLS}}", "{{EXTRA}}", "Outro"]:
+        doc.add_paragraph(text)
+    template = CompiledTemplate(doc)
+    out = tmp_path / "letter.docx"
+    template.render({"SKILLS": "Highlights:\n- Python\n- SQL"}, str(out))
+
+    rendered = Document(str(out))
+    assert [p.text for p in rendered.paragraphs] == ["Intro", "Highlights:", "Python", "SQL", "Outro"]
+    assert [p.style.name for p in rendered.paragraphs[2:4]] == ["List Bullet"] * 2
+    # Template styling applied once at compile time
+    assert rendered.styles["Normal"].font.name == "Times New Roman"
+
+
+def test_inline_placeholders_and_line_breaks(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Dear {{NAME}}, re: {{ROLE}}")
+    template = CompiledTemplate(doc)
+    out = tmp_path / "letter.docx"
+    template.render({"NAME": " Dr. O'Neil ", "ROLE": "Analyst\nLibrary"}, str(out))
+    assert texts(out) == ["Dear  Dr. O'Neil , re: Analyst\nLibrary"]
+
+
+def test_placeholder_split_across_runs(tmp_path):
+    doc = Document()
+    p = doc.add_paragraph("Hello ")
+    for piece in ["{{", "NA", "ME}}", "!"]:
+        p.add_run(piece)
+    template = CompiledTemplate(doc)
+    assert template.placeholders == {"NAME"}
+    out = tmp_path / "letter.docx"
+    template.render({"NAME": "Ada"}, str(out))
+    assert texts(out) == ["Hello Ada!"]
+
+
+def test_get_template_caches_and_recompiles_on_change(tmp_path):
+    path = tmp_path / "template.docx"
+    doc = Document()
+    doc.add_paragraph("{{BODY}}")
+    doc.save(str(path))
+
+    first = get_template(str(path))
+    assert first.placeholders == {"BODY"}
+    assert get_template(str(path)) is first
+
+    doc.add_paragraph("{{FULL_NAME}}")
+    doc.save(str(path))
+    os.utime(str(path), (os.path.getmtime(str(path)) + 5,) * 2)
+    assert get_template(str(path)).placeholders == {"BODY", "FULL_NAME"}
+
+
+def test_missing_or_placeholderless_template_uses_the_default(tmp_path):
+    default = get_template(str(tmp_path / "missing.docx"))
+    assert "BODY" in default.placeholders
+
+    plain = tmp_path / "plain.docx"
+    doc = Document()
+    doc.add_paragraph("No slots here")
+    doc.save(str(plain))
+    assert get_template(str(plain)) is default
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from .. import generator
+from ..generator import MAX_BACKOFF_SECONDS, ResponseCache, _backoff_delay, _generate_body_async
+
+
+def rate_limited(retry_after):
+    error = Exception("429")
+    error.response = SimpleNamespace(headers={"retry-after": retry_after})
+    return error
+
+
+@pytest.mark.parametrize("retry_after, expected", [
+    ("5", 5.0), ("0.5", 0.5), ("-3", 0.0), ("86400", MAX_BACKOFF_SECONDS), ("1e308", MAX_BACKOFF_SECONDS),
+])
+def test_retry_after_is_honoured_within_bounds(retry_after, expected):
+    assert _backoff_delay(0, rate_limited(retry_after)) == expected
+
+
+@pytest.mark.parametrize("retry_after", ["nan", "Wed, 21 Oct 2015 07:28:00 GMT", ""])
+def test_unusable_retry_after_falls_back_to_jittered_backoff(retry_after):
+    for attempt in range(8):
+        assert 0 <= _backoff_delay(attempt, rate_limited(retry_after)) <= min(MAX_BACKOFF_SECONDS, 2.0 ** attempt)
+
+
+def test_backoff_without_response_is_capped():
+    assert all(0 <= _backoff_delay(20, asyncio.TimeoutError()) <= MAX_BACKOFF_SECONDS for _ in range(100))
+
+
+class FlakyClient:
+    """responses.create fails `failures` times with a retryable error, then answers."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.responses = self
+
+    async def create(self, **request_args):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise asyncio.TimeoutError()
+        return SimpleNamespace(output_text="  Dear hiring committee,  ")
+
+
+@pytest.fixture
+def no_waiting(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator, "response_cache", ResponseCache(str(tmp_path / "llm_cache")))
+    delays = []
+    monkeypatch.setattr(generator, "_backoff_delay", lambda attempt, error: delays.append(attempt) or 0)
+    return delays
+
+
+def generate(client, semaphore=None, max_retries=3):
+    async def run():
+        return await _generate_body_async(client, semaphore or asyncio.Semaphore(1), "system", "user",
+                                          "model", timeout=5, max_retries=max_retries)
+    return asyncio.run(run())
+
+
+def test_retries_then_caches_the_answer(no_waiting):
+    client = FlakyClient(failures=2)
+    assert generate(client) == "Dear hiring committee,"
+    assert client.calls == 3 and no_waiting == [0, 1]
+    # Same request again: answered from the response cache
+    assert generate(client) == "Dear hiring committee,"
+    assert client.calls == 3
+
+
+def test_gives_up_after_max_retries(no_waiting):
+    client = FlakyClient(failures=10)
+    with pytest.raises(asyncio.TimeoutError):
+        generate(client, max_retries=2)
+    assert client.calls == 3
+
+
+def test_non_retryable_errors_fail_at_once(no_waiting):
+    class BadRequest(FlakyClient):
+        async def create(self, **request_args):
+            self.calls += 1
+            raise ValueError("bad request")
+    client = BadRequest(0)
+    with pytest.raises(ValueError):
+        generate(client)
+    assert client.calls == 1 and no_waiting == []
+
+
+def test_response_cache_expiry_and_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age_days=1, max_bytes=200)
+    keys = [ResponseCache.key({"n": n}) for n in range(4)]
+    for n, key in enumerate(keys):
+        cache.put(key, "x" * 40)
+        os.utime(os.path.join(str(tmp_path), f"{key}.json"), (time.time() - 60 * (4 - n),) * 2)
+    assert cache.get(keys[0]) == "x" * 40
+
+    old = os.path.join(str(tmp_path), f"{keys[0]}.json")
+    os.utime(old, (time.time() - 2 * 86400,) * 2)
+    assert cache.get(keys[0]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Expired entry removed first, then the oldest until under max_bytes
+    size = os.path.getsize(os.path.join(str(tmp_path), f"{keys[1]}.json"))
+    assert cache.evict() == 1 + max(0, 3 - 200 // size)
+    assert cache.get(keys[3]) == "x" * 40
@@ -0,0 +1,93 @@
+import multiprocessing
+import sys
+import threading
+
+import pytest
+
+
+def status_of(store, job_id):
+    return store._connect().execute(
+        "SELECT Status, Notes, Submission_Date FROM jobs WHERE Job_ID = ?", (str(job_id),)
+    ).fetchone()
+
+
+def test_status_changes_are_buffered_until_flush(store):
+    store.log_job({"Job_ID": 1, "Job_Title": "A"})
+    store.update_status(1, "Applied (Dry Run)", notes="first")
+    assert status_of(store, 1)[0] == "Pending"
+    store.flush()
+    assert status_of(store, 1)[:2] == ("Applied (Dry Run)", "first")
+
+
+def test_changes_to_one_job_collapse_and_keep_earlier_columns(store):
+    store.log_job({"Job_ID": 1, "Job_Title": "A"})
+    store.update_status(1, "Failed (Dry Run)", notes="timeout")
+    store.update_status(1, "Submitted")
+    assert len(store._pending) == 1
+    store.flush()
+    status, notes, submitted = status_of(store, 1)
+    assert (status, notes) == ("Submitted", "timeout")
+    assert submitted
+
+
+def test_batch_flushes_on_its_own(store, monkeypatch):
+    monkeypatch.setattr(store, "STATUS_FLUSH_BATCH", 3)
+    for job_id in range(3):
+        store.log_job({"Job_ID": job_id})
+        store.update_status(job_id, "Archived (Dry Run)")
+    assert not store._pending
+    assert store.status_counts() == {"Archived (Dry Run)": 3}
+
+
+def test_failed_flush_keeps_newer_changes(store, monkeypatch):
+    store.log_job({"Job_ID": 1})
+    store.update_status(1, "Applied (Dry Run)", notes="old")
+
+    def broken_batch():
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(store, "batch", broken_batch)
+    with pytest.raises(RuntimeError):
+        store.flush()
+    monkeypatch.undo()
+
+    store.update_status(1, "Submitted")
+    store.flush()
+    assert status_of(store, 1)[:2] == ("Submitted", "old")
+
+
+def test_threads_logging_at_once_lose_nothing(store):
+    def log_range(start):
+        for job_id in range(start, start + 50):
+            store.log_job({"Job_ID": job_id})
+            store.update_status(job_id, "Applied (Dry Run)")
+
+    threads = [threading.Thread(target=log_range, args=(n * 50,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.flush()
+    assert store.status_counts() == {"Applied (Dry Run)": 200}
+
+
+def _log_in_child(start):
+    from .. import logger
+    for job_id in range(start, start + 25):
+        logger.log_job({"Job_ID": job_id})
+        logger.update_status(job_id, "Applied (Dry Run)")
+    logger.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test_forked_processes_share_the_store(store):
+    # The parent's connection is open; children must open their own
+    store.log_job({"Job_ID": "parent"})
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_log_in_child, args=(n * 25,)) for n in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    assert len(store.known_job_ids()) == 101
+    assert store.status_counts()["Applied (Dry Run)"] == 100
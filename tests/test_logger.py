@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from ..logger import COLUMNS, _merge_columns
+
+# Header of the tracked logs/jobs_log.csv, with its hand-added column
+LEGACY_HEADER = ("Date_Discovered,Job_ID,Job_Title,Department,Resume_Type,Fail/Success(Dry Run),"
+                 "Status,Confirmation_Num,Deadline,Notes")
+
+
+def write_legacy_csv(path, rows):
+    path.write_text("\n".join([LEGACY_HEADER, *rows]) + "\n", encoding="utf-8")
+
+
+def test_merge_columns_keeps_csv_order_and_slots_in_missing_ones():
+    merged = _merge_columns(LEGACY_HEADER.split(","))
+    assert merged[:6] == ["Date_Discovered", "Job_ID", "Job_Title", "Department",
+                          "Resume_Type", "Fail/Success(Dry Run)"]
+    # Missing from the CSV: goes right after the column it follows in COLUMNS
+    assert merged.index("Submission_Date") == merged.index("Status") + 1
+    assert set(COLUMNS) <= set(merged)
+
+
+def test_merge_columns_of_empty_header_is_columns():
+    assert _merge_columns([]) == COLUMNS
+
+
+def test_migration_imports_rows_and_export_keeps_column_order(store, tmp_path):
+    csv_path = tmp_path / "jobs_log.csv"
+    write_legacy_csv(csv_path, [
+        "11/21/2025 10:07,F240010,Visiting Assistant Librarian,Library,Research,Fail,Failed (Dry Run),N/A,,",
+        '11/22/2025 19:49,R250153,"Programmer, Pediatrics",Pediatrics,Data,Fail,Failed (Dry Run),N/A,N/A,',
+    ])
+    store.init_log()
+    assert store.known_job_ids() == {"F240010", "R250153"}
+
+    assert store.export_csv(str(csv_path)) == 2
+    lines = csv_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == LEGACY_HEADER.replace("Status,", "Status,Submission_Date,")
+    assert lines[2].startswith('11/22/2025 19:49,R250153,"Programmer, Pediatrics",Pediatrics,Data,Fail,')
+
+
+def test_reexport_is_byte_identical(store, tmp_path):
+    csv_path = tmp_path / "jobs_log.csv"
+    write_legacy_csv(csv_path, ["11/21/2025 10:07,F240010,Librarian,Library,Research,Fail,Failed (Dry Run),N/A,,"])
+    store.init_log()
+    store.export_csv(str(csv_path))
+    first = csv_path.read_bytes()
+    store.export_csv(str(csv_path))
+    assert csv_path.read_bytes() == first
+    assert b"\r\n" not in first
+
+
+def test_migration_runs_once(store, tmp_path):
+    csv_path = tmp_path / "jobs_log.csv"
+    write_legacy_csv(csv_path, ["11/21/2025 10:07,F240010,Librarian,Library,Research,Fail,Failed (Dry Run),N/A,,"])
+    store.init_log()
+    store.close()
+    # Rows added to the CSV later are not imported again on the next connection
+    write_legacy_csv(csv_path, ["11/21/2025 10:07,X1,Other,Library,Research,Fail,Pending,N/A,,"])
+    store.init_log()
+    assert store.known_job_ids() == {"F240010"}
+
+
+def test_log_job_inserts_then_refreshes_without_touching_status(store):
+    assert store.log_job({"Job_ID": 101, "Job_Title": "Analyst", "Department": "IT", "Resume_Type": "Data"})
+    store.update_status(101, "Applied (Dry Run)")
+    store.flush()
+
+    assert not store.log_job({"Job_ID": "101", "Job_Title": "Senior Analyst", "Department": None})
+    conn = store._connect()
+    row = conn.execute("SELECT Job_Title, Department, Resume_Type, Status FROM jobs WHERE Job_ID = '101'").fetchone()
+    # Title refreshed, missing fields keep the logged value, status untouched
+    assert row == ("Senior Analyst", "IT", "Data", "Applied (Dry Run)")
+
+
+def test_failed_migration_leaves_no_open_transaction(store, tmp_path):
+    # A quote in a column name breaks the CREATE TABLE of the migrated schema
+    (tmp_path / "jobs_log.csv").write_text('Job_ID,Bad"Column\nF1,x\n', encoding="utf-8")
+    with pytest.raises(sqlite3.OperationalError):
+        store.init_log()
+    assert not store._connect().in_transaction
+    # The store still takes writes
+    assert store.log_job({"Job_ID": "F2", "Job_Title": "Analyst"})
+    assert store.known_job_ids() == {"F2"}
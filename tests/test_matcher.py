@@ -0,0 +1,90 @@
+import random
+import re
+
+import pytest
+
+from ..config import RESUME_PATHS
+from ..matcher import (
+    KEYWORDS, SKILL_INDEX, TITLE_INDEX, KeywordIndex, classify_jobs, count_matches, determine_resume_type,
+)
+
+
+def regex_counts(text, keywords):
+    """Reference semantics: one lookahead alternation, longest keyword first."""
+    ordered = sorted(keywords, key=len, reverse=True)
+    pattern = re.compile(r"(?<!\w)(?=(" + "|".join(map(re.escape, ordered)) + r")(?!\w))")
+    counts = {}
+    for m in pattern.finditer(text):
+        counts[m.group(1)] = counts.get(m.group(1), 0) + 1
+    return counts
+
+
+def test_matches_the_regex_on_random_texts():
+    rng = random.Random(7)
+    for index in (SKILL_INDEX, TITLE_INDEX):
+        keywords = sorted(index._single | {kw for kw, _ in index._phrases}
+                          | {kw for group in index._nested.values() for kw, _ in group})
+        pieces = keywords + [w for kw in keywords for w in kw.split()] + [
+            "rust", "aim", "mlops", "r2", "data_set", "e-mail", "café", "naïve", "data’s", "—", "\n"]
+        separators = [" ", " ", " ", ", ", ". ", "-", "/", "(", ")", "’", "\t", ""]
+        for _ in range(1500):
+            text = "".join(rng.choice(pieces) + rng.choice(separators) for _ in range(rng.randint(0, 40)))
+            assert index.counts(text) == regex_counts(text, keywords), text
+
+
+def test_short_keywords_match_whole_words_only():
+    index = KeywordIndex(["r", "ai", "ml"])
+    assert index.counts("r, ai and ml") == {"r": 1, "ai": 1, "ml": 1}
+    assert index.counts("rust, aim, html, mlops, r2, r_lang") == {}
+    assert index.counts("(r) [ai]/ml.") == {"r": 1, "ai": 1, "ml": 1}
+
+
+def test_punctuation_boundaries():
+    index = KeywordIndex(["power bi", "data-driven"])
+    assert index.counts("power bi, data-driven.") == {"power bi": 1, "data-driven": 1}
+    # Multi-word keywords need their exact separator
+    assert index.counts("power-bi and data driven") == {}
+    assert index.counts("superpower bi") == {}
+    # Non-ASCII punctuation separates words too
+    assert index.counts("power bi’s data-driven—work") == {"power bi": 1, "data-driven": 1}
+
+
+def test_nested_keywords_count_the_longest_at_each_start():
+    index = KeywordIndex(["data", "data analysis", "data analysis tools"])
+    assert index.counts("data analysis tools") == {"data analysis tools": 1}
+    assert index.counts("data analysis and data, data analysis") == {"data analysis": 2, "data": 1}
+    assert index.counts("data analysis and data", distinct=True).keys() == {"data analysis", "data"}
+
+
+def test_overlapping_keywords_both_count():
+    index = KeywordIndex(["machine learning", "learning analytics"])
+    assert index.counts("machine learning analytics") == {"machine learning": 1, "learning analytics": 1}
+
+
+def test_keywords_must_start_and_end_with_a_word_character():
+    with pytest.raises(ValueError):
+        KeywordIndex(["c++"])
+
+
+def test_count_matches_counts_distinct_keywords():
+    assert count_matches("Python, SQL and more Python", ["Python", "SQL", "Tableau"]) == 2
+
+
+def test_categories_are_the_resume_keys():
+    # "Associate" was renamed "ASSOCIATE" to match RESUME_PATHS
+    assert set(KEYWORDS) == set(RESUME_PATHS)
+    assert determine_resume_type("Groundskeeper", "Mows lawns.") == "ASSOCIATE"
+    assert determine_resume_type("Data Analyst", "Python and SQL") == "DATA"
+    assert determine_resume_type("Research Scientist", "XRD and SEM characterization") == "RESEARCH"
+
+
+def test_batch_classification_agrees_with_single_jobs():
+    jobs = [
+        {"Job_Title": "Data Analyst", "Description": "Python, SQL, Tableau"},
+        {"Job_Title": "Program Associate", "Description": "project management and communication"},
+        {"Job_Title": "Groundskeeper", "Description": ""},
+        {"Job_Title": "Process Engineer", "Description": "synthesis, microscopy, XRD"},
+    ]
+    labels, scores = classify_jobs(jobs)
+    assert labels == [determine_resume_type(j["Job_Title"], j["Description"]) for j in jobs]
+    assert scores.shape == (4, len(KEYWORDS))
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+import pytest
+
+from ..near_duplicates import MinHasher, NearDuplicates, shingles, similarity
+
+VOCABULARY = [f"w{i}" for i in range(2000)]
+
+
+def posting(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def edited(text, changes, seed=0):
+    """text with `changes` words replaced."""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), changes):
+        words[i] = "edited"
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    a, b = set(shingles(a)), set(shingles(b))
+    return len(a & b) / len(a | b)
+
+
+def test_shingles():
+    assert len(shingles("")) == 0
+    # Fewer words than a shingle: the whole text is one shingle
+    assert len(shingles("Data Analyst")) == 1
+    assert len(shingles(" ".join("abcdefg"), k=5)) == 3
+    # Case and punctuation don't matter
+    assert set(shingles("Data, ANALYST!")) == set(shingles("data analyst"))
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHasher(permutations=100, bands=16)
+
+
+def test_signatures_are_stable_across_hashers():
+    text = posting(1)
+    assert np.array_equal(MinHasher().signature(text), MinHasher().signature(text))
+    assert MinHasher().signature("   ") is None
+
+
+def test_similarity_estimates_jaccard():
+    hasher = MinHasher()
+    base = posting(1)
+    for changes in (2, 10, 40):
+        other = edited(base, changes)
+        estimate = similarity(hasher.signature(base), hasher.signature(other))
+        # 128 permutations: standard error is at most ~0.045
+        assert abs(estimate - jaccard(base, other)) < 0.15
+    assert similarity(hasher.signature(base), hasher.signature(posting(2))) < 0.1
+
+
+def test_close_signatures_share_a_bucket():
+    hasher = MinHasher()
+    base = posting(1)
+    near = set(hasher.buckets(hasher.signature(edited(base, 2))))
+    far = set(hasher.buckets(hasher.signature(posting(2))))
+    own = set(hasher.buckets(hasher.signature(base)))
+    assert len(own) == hasher.bands
+    assert own & near
+    assert not own & far
+
+
+def test_repost_is_flagged_with_the_earlier_resume_and_letter(store):
+    duplicates = NearDuplicates(threshold=0.9)
+    base = posting(1)
+    store.log_job({"Job_ID": "A1", "Resume_Type": "Data"})
+    assert duplicates.add({"Job_ID": "A1", "Description": base}) is None
+    duplicates.record_letter("A1", "Cover_Letter_A1.docx")
+
+    match = duplicates.add({"Job_ID": "B2", "Description": edited(base, 2)})
+    assert match["Job_ID"] == "A1"
+    assert match["Similarity"] >= 0.9
+    assert (match["Resume_Type"], match["Cover_Letter"]) == ("Data", "Cover_Letter_A1.docx")
+    assert duplicates.flagged == 1
+
+
+def test_below_threshold_is_not_a_duplicate(store):
+    duplicates = NearDuplicates(threshold=0.9)
+    base = posting(1)
+    duplicates.add({"Job_ID": "A1", "Description": base})
+    assert duplicates.add({"Job_ID": "B2", "Description": edited(base, 60)}) is None
+    assert duplicates.add({"Job_ID": "C3", "Description": posting(3)}) is None
+    assert duplicates.add({"Job_ID": "D4", "Description": ""}) is None
+    assert duplicates.flagged == 0
+
+
+def test_rescraped_posting_keeps_its_letter_and_replaces_its_buckets(store):
+    duplicates = NearDuplicates()
+    base = posting(1)
+    duplicates.add({"Job_ID": "A1", "Description": base})
+    duplicates.record_letter("A1", "Cover_Letter_A1.docx")
+    duplicates.add({"Job_ID": "A1", "Description": posting(2)})
+
+    conn = store._connect()
+    assert conn.execute("SELECT Cover_Letter FROM minhashes WHERE Job_ID = 'A1'").fetchone() == ("Cover_Letter_A1.docx",)
+    assert conn.execute("SELECT COUNT(*) FROM lsh_buckets WHERE Job_ID = 'A1'").fetchone() == (duplicates.hasher.bands,)
+    # The old text no longer points at A1, the new one does
+    assert duplicates.add({"Job_ID": "B2", "Description": base}) is None
+    assert duplicates.add({"Job_ID": "C3", "Description": posting(2)})["Cover_Letter"] == "Cover_Letter_A1.docx"
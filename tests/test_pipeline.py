@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+from .. import generator
+from ..pipeline import run_pipeline
+
+
+class Client:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class Requested(list):
+    client = None
+
+
+@pytest.fixture
+def letters(tmp_path, monkeypatch):
+    """Stubs the LLM and DOCX steps; returns the job ids sent to the LLM."""
+    requested = Requested()
+    client = Client()
+
+    async def body(client, semaphore, job, resume_type, personal_info):
+        async with semaphore:
+            await asyncio.sleep(0.01)
+        if job["Job_ID"] == "bad":
+            raise RuntimeError("rate limited")
+        requested.append(job["Job_ID"])
+        return f"Letter for {job['Job_ID']}"
+
+    def docx(job, resume_type, personal_info, body_text):
+        path = tmp_path / f"{job['Job_ID']}.docx"
+        path.write_text(body_text, encoding="utf-8")
+        return str(path)
+
+    monkeypatch.setattr(generator, "new_async_client", lambda: client)
+    monkeypatch.setattr(generator, "generate_cover_letter_body_async", body)
+    monkeypatch.setattr(generator, "generate_cover_letter_docx", docx)
+    requested.client = client
+    return requested
+
+
+def classify(job):
+    if job["Job_ID"] == "dup":
+        return False
+    job["Resume_Type"] = "DATA"
+
+
+def test_every_classified_job_is_applied_once(letters):
+    jobs = [{"Job_ID": str(n)} for n in range(12)]
+    applied = []
+    main_thread = threading.current_thread()
+
+    def apply(job):
+        # Applying drives the browser page, so it must stay on the caller's thread
+        assert threading.current_thread() is main_thread
+        applied.append(job["Job_ID"])
+
+    finished = run_pipeline(iter(jobs), classify, apply, {}, queue_size=2, concurrency=3)
+    assert sorted(applied, key=int) == [str(n) for n in range(12)]
+    assert [job["Job_ID"] for job in finished] == applied
+    assert all(job["Cover_Letter"].endswith(f"{job['Job_ID']}.docx") for job in finished)
+    assert letters.client.closed
+
+
+def test_dropped_failed_and_pregenerated_jobs(letters, tmp_path):
+    existing = tmp_path / "kept.docx"
+    existing.write_text("old letter", encoding="utf-8")
+    jobs = [{"Job_ID": "dup"}, {"Job_ID": "bad"}, {"Job_ID": "kept", "Cover_Letter": str(existing)},
+            {"Job_ID": "new"}]
+
+    def broken_classify(job):
+        if job["Job_ID"] == "new":
+            raise ValueError("no description")
+        return classify(job)
+
+    finished = {job["Job_ID"]: job for job in run_pipeline(jobs, broken_classify, lambda job: None, {})}
+    # classify returning False or raising drops the job
+    assert set(finished) == {"bad", "kept"}
+    # A failed letter still reaches apply, without a letter
+    assert finished["bad"]["Cover_Letter"] is None
+    # An existing letter is reused without calling the LLM
+    assert finished["kept"]["Cover_Letter"] == str(existing)
+    assert letters == []
+
+
+def test_apply_error_stops_the_stages(letters):
+    def apply(job):
+        raise RuntimeError("browser closed")
+
+    jobs = ({"Job_ID": str(n)} for n in range(50))
+    with pytest.raises(RuntimeError, match="browser closed"):
+        run_pipeline(jobs, classify, apply, {}, queue_size=2)
+    assert not [t for t in threading.enumerate() if t.name in ("classify", "generate")]
@@ -0,0 +1,118 @@
+import json
+import zlib
+
+import pytest
+
+from ..posting_archive import HEADER, MAGIC, PostingArchive
+
+
+def job(job_id, description="Maintains the data warehouse.", **fields):
+    return {"Job_ID": job_id, "Job_Title": "Analyst", "Department": "IT",
+            "Description": description, "Link": f"https://example.edu/postings/{job_id}", **fields}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "postings.archive")
+
+
+def test_frames_are_magic_length_and_zlib_json(path):
+    archive = PostingArchive(path)
+    archive.append(job("1"), fetched_at=1700000000.0)
+    archive.close()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, length = HEADER.unpack_from(data)
+    assert magic == MAGIC
+    assert len(data) == HEADER.size + length
+    record = json.loads(zlib.decompress(data[HEADER.size:]))
+    assert record["Job_ID"] == "1"
+    assert record["Fetched_At"] == 1700000000.0
+
+    with open(f"{path}.idx", encoding="utf-8") as f:
+        assert f.read().split("\t")[:3] == ["1", str(HEADER.size), str(length)]
+
+
+def test_unchanged_snapshot_is_not_written_again(path):
+    archive = PostingArchive(path)
+    assert archive.append(job("1"))
+    # Only the extracted fields count, not extra keys or the fetch time
+    assert not archive.append(job("1", Resume_Type="Data"))
+    assert archive.append(job("1", description="Now also runs the BI team."))
+    assert archive.append(job("2"))
+    assert archive.appended == 3
+    assert [r["Description"] for r in archive.history("1")] == [
+        "Maintains the data warehouse.", "Now also runs the BI team."]
+    archive.close()
+
+
+def test_reads_latest_snapshots_in_file_order(path):
+    archive = PostingArchive(path)
+    archive.append(job("1"))
+    archive.append(job("2"))
+    archive.append(job("1", description="Edited."))
+    # Read while still appending: the mapping is refreshed as the file grows
+    assert archive.get("1")["Description"] == "Edited."
+    archive.append(job("3"))
+    assert [r["Job_ID"] for r in archive] == ["2", "1", "3"]
+    assert len(list(archive.records(latest_only=False))) == 4
+    assert "3" in archive and "4" not in archive and archive.get("4") is None
+    archive.close()
+
+
+def test_reopened_archive_keeps_its_index(path):
+    archive = PostingArchive(path)
+    archive.append(job("1"))
+    archive.close()
+
+    archive = PostingArchive(path)
+    assert len(archive) == 1
+    assert not archive.append(job("1"))
+    assert archive.get("1")["Link"].endswith("/1")
+    archive.close()
+
+
+def test_frame_without_index_line_is_recovered(path, capsys):
+    archive = PostingArchive(path)
+    archive.append(job("1"))
+    archive.append(job("2"))
+    archive.close()
+    # Crash between the data and index writes: the last index line is lost
+    with open(f"{path}.idx", encoding="utf-8") as f:
+        first_line = f.readline()
+    with open(f"{path}.idx", "w", encoding="utf-8") as f:
+        f.write(first_line)
+
+    archive = PostingArchive(path)
+    assert "Re-indexed 1 archived postings." in capsys.readouterr().out
+    assert archive.get("2")["Job_ID"] == "2"
+    archive.close()
+    # The recovered frame is indexed for good
+    with open(f"{path}.idx", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_truncated_frame_and_half_written_index_line_are_ignored(path, capsys):
+    archive = PostingArchive(path)
+    archive.append(job("1"))
+    archive.append(job("2"))
+    archive.close()
+    with open(f"{path}.idx", encoding="utf-8") as f:
+        lines = f.readlines()
+    # Crash halfway through the second frame and its index line
+    with open(f"{path}.idx", "w", encoding="utf-8") as f:
+        f.write(lines[0] + lines[1][:5])
+    with open(path, "r+b") as f:
+        f.truncate(int(lines[1].split("\t")[1]) + 3)
+
+    archive = PostingArchive(path)
+    assert "truncated" in capsys.readouterr().out
+    assert len(archive) == 1
+    # New snapshots still land on their own index line and read back
+    assert archive.append(job("3"))
+    archive.close()
+
+    archive = PostingArchive(path)
+    assert sorted(r["Job_ID"] for r in archive) == ["1", "3"]
+    archive.close()
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from ..http_scraper import _fetch_posting
+from ..posting_cache import PostingCache, content_hash
+
+LINK = "http://portal.test/postings/20001"
+TARGET = ("20001", {"href": LINK, "title": "Data Analyst"})
+PAGE = ("<html><body><table><tr><th>Department</th><td>Enterprise Data Services</td></tr></table>"
+        "<h2>Position Summary</h2><p>" + "Build dashboards in Python and SQL. " * 10 + "</p></body></html>")
+
+
+class Response:
+    def __init__(self, status_code=200, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+        self.url = LINK
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class Session:
+    """Answers each get() with the next response, recording the request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, link, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PostingCache(str(tmp_path / "posting_cache.json"), ttl_hours=1, max_entries=3)
+
+
+def test_first_fetch_parses_and_caches_validators(cache):
+    session = Session(Response(200, PAGE, {"ETag": '"20001-1"', "Last-Modified": "Mon, 01 Sep 2025 10:00:00 GMT"}))
+    job = _fetch_posting(session, TARGET, cache)
+    assert job["Department"] == "Enterprise Data Services"
+    assert "Unchanged" not in job
+    assert session.requests == [{}]
+    assert cache.validators("20001") == {"If-None-Match": '"20001-1"',
+                                         "If-Modified-Since": "Mon, 01 Sep 2025 10:00:00 GMT"}
+
+
+def test_304_reuses_the_cached_posting(cache):
+    _fetch_posting(Session(Response(200, PAGE, {"ETag": '"20001-1"'})), TARGET, cache)
+    cache.annotate("20001", Resume_Type="DATA")
+
+    session = Session(Response(304))
+    job = _fetch_posting(session, TARGET, cache)
+    assert session.requests == [{"If-None-Match": '"20001-1"'}]
+    assert job["Unchanged"] and job["Resume_Type"] == "DATA"
+    assert cache.hits == 1
+
+
+def test_304_for_an_expired_entry_fetches_again(cache, monkeypatch):
+    _fetch_posting(Session(Response(200, PAGE, {"ETag": '"20001-1"'})), TARGET, cache)
+    session = Session(Response(304), Response(200, PAGE))
+    # Expires between building the validators and reading the entry back
+    validators = cache.validators("20001")
+    monkeypatch.setattr(cache, "validators", lambda job_id: validators)
+    monkeypatch.setattr(cache, "get", lambda job_id: None)
+    job = _fetch_posting(session, TARGET, cache)
+    assert session.requests == [{"If-None-Match": '"20001-1"'}, {}]
+    assert job["Job_Title"] == "Data Analyst"
+
+
+def test_200_with_the_same_content_counts_as_unchanged(cache):
+    _fetch_posting(Session(Response(200, PAGE)), TARGET, cache)
+    job = _fetch_posting(Session(Response(200, PAGE)), TARGET, cache)
+    assert job["Unchanged"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_edited_posting_is_parsed_again(cache):
+    _fetch_posting(Session(Response(200, PAGE, {"ETag": '"20001-1"'})), TARGET, cache)
+    edited = PAGE.replace("dashboards", "pipelines")
+    job = _fetch_posting(Session(Response(200, edited, {"ETag": '"20001-2"'})), TARGET, cache)
+    assert "Unchanged" not in job and "pipelines" in job["Description"]
+    assert cache.get("20001")["Content_Hash"] == content_hash(edited)
+
+
+def test_network_error_falls_back_to_the_browser(cache):
+    assert _fetch_posting(Session(Response(500)), TARGET, cache) is None
+
+
+def test_ttl_and_eviction(cache, tmp_path, monkeypatch):
+    for n in range(5):
+        cache.put({"Job_ID": n, "Job_Title": f"Job {n}"}, f"hash{n}")
+        cache._entries[str(n)]["Fetched_At"] = time.time() - 60 * (5 - n)
+    assert 0 in cache and cache.get(0)["Job_Title"] == "Job 0"
+
+    cache._entries["0"]["Fetched_At"] = time.time() - 2 * 3600
+    assert 0 not in cache and cache.get(0) is None
+    assert cache.validators(0) == {}
+
+    cache.save()
+    reloaded = PostingCache(cache.path, ttl_hours=1, max_entries=3)
+    # Expired entry dropped, then only the three most recently fetched are kept
+    assert sorted(reloaded._entries) == ["2", "3", "4"]
+
+
+def test_unreadable_cache_file_starts_empty(tmp_path, capsys):
+    path = tmp_path / "posting_cache.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert PostingCache(str(path))._entries == {}
+    assert "starting empty" in capsys.readouterr().out
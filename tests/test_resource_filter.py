@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import pytest
+
+from ..config import LOGIN_URL
+from ..resource_filter import ResourceFilter
+
+PORTAL = urlparse(LOGIN_URL).hostname
+
+
+class Emitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, arg=None):
+        for handler in self.handlers.get(event, []):
+            handler(arg)
+
+
+class Context(Emitter):
+    def route(self, pattern, handler):
+        self.handler = handler
+
+
+class Page(Emitter):
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+        self.main_frame = SimpleNamespace(page=self)
+
+
+class Route:
+    def __init__(self, page, url, resource_type, navigation=False):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type, frame=page.main_frame,
+                                       is_navigation_request=lambda: navigation)
+        self.outcome = None
+
+    def continue_(self):
+        self.outcome = "continue"
+
+    def abort(self):
+        self.outcome = "abort"
+
+
+@pytest.fixture
+def filtered():
+    resource_filter = ResourceFilter(
+        profile="minimal",
+        phase_allow={"login": ["stylesheet", "*"], "apply": ["stylesheet", "cdn.example.org"]},
+    )
+    context = Context()
+    resource_filter.install(context, phase="search")
+    page = Page(context)
+    context.emit("page", page)
+
+    def request(url, resource_type, navigation=False):
+        route = Route(page, url, resource_type, navigation)
+        context.handler(route)
+        return route.outcome
+
+    return resource_filter, page, request
+
+
+def test_profile_blocks_by_type_and_host(filtered):
+    resource_filter, page, request = filtered
+    assert request(f"https://{PORTAL}/postings/1", "document") == "continue"
+    assert request(f"https://{PORTAL}/app.js", "script") == "continue"
+    assert request(f"https://assets.{PORTAL}/app.js", "script") == "continue"
+    assert request(f"https://{PORTAL}/logo.png", "image") == "abort"
+    assert request(f"https://{PORTAL}/site.css", "stylesheet") == "abort"
+    assert request("https://www.google-analytics.com/analytics.js", "script") == "abort"
+    # Navigations always go through, even to other hosts
+    assert request("https://sso.example.edu/login", "document", navigation=True) == "continue"
+    assert resource_filter.blocked == {"image": 1, "stylesheet": 1, "third-party": 1}
+
+
+def test_phase_allow_lists(filtered):
+    resource_filter, page, request = filtered
+    resource_filter.set_phase(page, "apply")
+    assert request(f"https://{PORTAL}/site.css", "stylesheet") == "continue"
+    assert request("https://cdn.example.org/form.js", "script") == "continue"
+    assert request("https://other.example.org/form.js", "script") == "abort"
+    # The allow-list names types and hosts, it does not lift the rest of the profile
+    assert request(f"https://{PORTAL}/logo.png", "image") == "abort"
+
+    resource_filter.set_phase(page, "login")
+    assert request("https://sso.example.edu/idp.js", "script") == "continue"
+    assert request("https://sso.example.edu/logo.png", "image") == "abort"
+
+
+def test_page_phase_is_forgotten_on_close(filtered):
+    resource_filter, page, request = filtered
+    resource_filter.set_phase(page, "apply")
+    page.emit("close")
+    # Back to the context's phase
+    assert request(f"https://{PORTAL}/site.css", "stylesheet") == "abort"
+    assert page not in resource_filter._page_phase
+
+
+def test_full_profile_installs_no_route():
+    context = Context()
+    ResourceFilter(profile="full", phase_allow={}).install(context, phase="search")
+    assert not hasattr(context, "handler")
+
+
+def test_page_stats_and_reset(filtered):
+    resource_filter, page, request = filtered
+    navigation = SimpleNamespace(frame=page.main_frame, is_navigation_request=lambda: True)
+    page.emit("request", navigation)
+    page.emit("response", SimpleNamespace(headers={"content-length": "2048"}))
+    page.emit("response", SimpleNamespace(headers={"transfer-encoding": "chunked"}))
+    page.emit("load")
+    # A load without a navigation of ours (e.g. an iframe) is not counted
+    page.emit("load")
+    request(f"https://{PORTAL}/logo.png", "image")
+
+    stats = resource_filter.pages["search"]
+    assert stats["pages"] == 1 and stats["bytes"] == 2048
+    assert "Blocked 1 requests (image: 1)." in resource_filter.report()
+
+    resource_filter.reset()
+    assert resource_filter.blocked == {} and resource_filter.pages == {}
+    assert resource_filter.report() == "Blocked 0 requests."
@@ -0,0 +1,243 @@
+"""
+Lightweight timed spans for each phase and job.
+
+    with span("detail", job_id=job_id) as s:
+        ...
+        s.set(bytes=len(html))
+
+Tracing is off unless enable() is called (main does it when UB_TRACE_FILE
+is set or --trace is given). While it is off, span() hands back one shared
+no-op object, so instrumented code pays a global lookup and a call.
+
+When on, every finished span is appended to a JSON-lines file as it ends,
+and finish() also writes a Chrome trace-event file (open it in
+chrome://tracing or https://ui.perfetto.dev) and returns a summary table.
+A long-running process calls rotate() between scans instead, which writes
+the trace so far and frees its spans.
+"""
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+_tracer = None
+# Innermost open span in this thread / asyncio task
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.id = next(self.tracer._ids)
+        parent = _current.get()
+        self.parent = parent.id if parent else None
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._record(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.chrome_path = os.path.splitext(path)[0] + ".trace.json"
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._lanes = {}
+        self.rotated = False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _lane(self):
+        # Chrome traces stack spans per tid; concurrent asyncio tasks on one
+        # thread each get their own lane so their spans don't interleave
+        # asyncio is not imported just for this: if nothing loaded it, there is no task
+        asyncio = sys.modules.get("asyncio")
+        try:
+            task = asyncio.current_task() if asyncio else None
+        except RuntimeError:
+            task = None
+        key = (threading.get_ident(), id(task) if task else None)
+        lane = self._lanes.get(key)
+        if lane is None:
+            name = threading.current_thread().name + (f" / {task.get_name()}" if task else "")
+            lane = self._lanes[key] = (len(self._lanes) + 1, name)
+        return lane
+
+    def _record(self, span):
+        record = {
+            "id": span.id,
+            "parent": span.parent,
+            "name": span.name,
+            "start": round(self.started_at + (span.start - self.origin), 6),
+            "duration": round(span.duration, 6),
+            "attrs": span.attrs,
+        }
+        with self._lock:
+            if self._file.closed:
+                # Span that outlived the run (a worker still shutting down)
+                return
+            record["lane"] = self._lane()[0]
+            span.lane = record["lane"]
+            self.spans.append(span)
+            self._file.write(json.dumps(record, default=str) + "\n")
+
+    def write_chrome_trace(self, spans=None, lanes=None):
+        pid = os.getpid()
+        if spans is None:
+            with self._lock:
+                spans, lanes = list(self.spans), dict(self._lanes)
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in lanes.values()
+        ]
+        events += [
+            {
+                "name": s.name, "cat": s.name.split(".")[0], "ph": "X", "pid": pid, "tid": s.lane,
+                "ts": round((s.start - self.origin) * 1e6), "dur": round(s.duration * 1e6),
+                "args": s.attrs,
+            }
+            for s in spans
+        ]
+        with open(self.chrome_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def summary(self, spans=None):
+        if spans is None:
+            with self._lock:
+                spans = list(self.spans)
+        by_name = {}
+        for s in spans:
+            by_name.setdefault(s.name, []).append(s.duration)
+        return summary_table(by_name)
+
+    def rotate(self):
+        """
+        Writes the Chrome trace of the spans recorded since the last rotation
+        and drops them from memory (the JSON-lines file keeps them), so a
+        long-running process doesn't hold every span. Returns their summary.
+        """
+        with self._lock:
+            spans, lanes = self.spans, self._lanes
+            self.spans, self._lanes = [], {}
+            self.rotated = True
+        self.write_chrome_trace(spans, lanes)
+        return self.summary(spans)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summary_table(durations):
+    """Text table of count, p50/p90/p99 and total per span name, from {name: [seconds]}."""
+    lines = [f"{'span':<22}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'total s':>10}"]
+    for name in sorted(durations):
+        values = durations[name]
+        p50, p90, p99 = (percentile(values, p) * 1000 for p in (50, 90, 99))
+        lines.append(f"{name:<22}{len(values):>7}{p50:>10.0f}{p90:>10.0f}{p99:>10.0f}{sum(values):>10.1f}")
+    return "\n".join(lines)
+
+
+def read_spans(path):
+    """The spans of a JSON-lines trace file, as dicts."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def enable(path):
+    """Starts recording spans to path (JSON lines)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+    return _tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **attrs):
+    """A timed span; use as a context manager. No-op while tracing is off."""
+    if _tracer is None:
+        return _NOOP
+    return Span(_tracer, name, attrs)
+
+
+def annotate(**attrs):
+    """Adds attributes to the innermost open span, if any."""
+    if _tracer is None:
+        return
+    current = _current.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def rotate():
+    """
+    Writes the Chrome trace of the spans since the last rotation, frees them
+    and returns their summary table, or None if tracing is off. The daemon
+    calls it after every scan.
+    """
+    if _tracer is None:
+        return None
+    return f"{_tracer.rotate()}\nTrace of this scan written to {_tracer.chrome_path}"
+
+
+def finish():
+    """
+    Writes the Chrome trace, closes the JSON-lines file and returns the
+    summary table, or None if tracing was off.
+    """
+    global _tracer
+    if _tracer is None:
+        return None
+    tracer, _tracer = _tracer, None
+    # After rotations the Chrome trace keeps the last scan, not the few spans left over
+    if not tracer.rotated:
+        tracer.write_chrome_trace()
+    tracer.close()
+    return f"{tracer.summary()}\nTrace written to {tracer.path} and {tracer.chrome_path}"
@@ -0,0 +1,221 @@
+import queue
+import threading
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+from .auth import saved_state
+from .config import HEADLESS
+from .resource_filter import resource_filter
+
+# How often idle workers wake up to check for shutdown
+_POLL_SECONDS = 0.1
+
+
+@contextmanager
+def worker_context(storage_state=None, phase=None):
+    """
+    A browser context for a worker thread: its own Playwright instance and
+    browser (the sync API is not thread-safe), started from storage_state,
+    with requests filtered for the given phase.
+    """
+    with sync_playwright() as p:
+        # Shutdown on a signal is up to the caller (the daemon finishes its scan first)
+        browser = p.chromium.launch(headless=HEADLESS, handle_sigint=False,
+                                    handle_sigterm=False, handle_sighup=False)
+        try:
+            context = browser.new_context(storage_state=storage_state)
+            resource_filter.install(context, phase)
+            yield context
+        finally:
+            browser.close()
+
+
+class PageWorkers:
+    """
+    Browser workers kept for a whole scan: one thread, Playwright instance,
+    browser and page each (the sync API is not thread-safe). The browsers
+    start on the first imap() and are reused by every later call, so a scan
+    over many results pages launches them once.
+
+    All contexts are created from the same storage_state, so they share the
+    logged-in session without logging in again. Without a storage_state, the
+    state saved at the last login is used. close() stops and joins them.
+    """
+
+    def __init__(self, storage_state=None, concurrency=4, phase=None):
+        self.storage_state = storage_state
+        self.concurrency = max(1, concurrency)
+        self.phase = phase
+        self._work = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _start(self):
+        if self._threads:
+            return
+        if self.storage_state is None:
+            self.storage_state = saved_state()
+        self._threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"page-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _worker(self, worker_id):
+        try:
+            with worker_context(self.storage_state, self.phase) as context:
+                page = context.new_page()
+                while not self._stop.is_set():
+                    try:
+                        done, cancelled, index, handler, item = self._work.get(timeout=_POLL_SECONDS)
+                    except queue.Empty:
+                        continue
+                    if cancelled.is_set():
+                        continue
+                    try:
+                        result = handler(page, item)
+                    except Exception as e:
+                        print(f"[worker {worker_id}] Error on item {index}: {e}")
+                        result = None
+                    done.put((index, result))
+        except Exception as e:
+            # A worker that cannot start leaves its share of the queue to the others
+            print(f"[worker {worker_id}] Could not start browser: {e}")
+
+    def _alive(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def imap(self, items, handler):
+        """
+        Runs handler(page, item) for every item and yields the results in the
+        same order as items, each one as soon as it (and everything before it)
+        is done. An item whose handler raised yields None and never affects
+        the others. Closing the generator early drops its items not yet started.
+        """
+        items = list(items)
+        if not items:
+            return
+        self._start()
+
+        done = queue.Queue()
+        cancelled = threading.Event()
+        for index, item in enumerate(items):
+            self._work.put((done, cancelled, index, handler, item))
+
+        # Workers finish out of order; hold results back until their turn comes
+        pending = {}
+        next_index = 0
+        try:
+            while next_index < len(items):
+                try:
+                    index, result = done.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    if not self._alive():
+                        break
+                    continue
+                pending[index] = result
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+        finally:
+            cancelled.set()
+
+        if next_index < len(items):
+            print(f"WARNING: {len(items) - next_index} items were not processed (no worker could start).")
+            for index in range(next_index, len(items)):
+                yield pending.pop(index, None)
+
+    def close(self):
+        """Stops the workers after their current item and waits for their browsers to close."""
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+
+class PagePool:
+    """
+    Long-lived browser workers that take items from a queue as they arrive.
+
+    Each worker has its own browser context started from storage_state and
+    runs handler(page, item) on a fresh page per item, so a failed or stuck
+    item never leaves state behind for the next one. Every page gets
+    timeout_ms as its default timeout: a stalled navigation or selector raises
+    inside that worker instead of blocking it forever. The workers start on
+    the first submit(), which blocks while all of them are busy and the queue
+    is full.
+    """
+
+    _STOP = object()
+
+    def __init__(self, handler, storage_state=None, concurrency=2, timeout_ms=60000, phase=None):
+        self.handler = handler
+        self.storage_state = storage_state if storage_state is not None else saved_state()
+        self.timeout_ms = timeout_ms
+        self.phase = phase
+        self.concurrency = max(1, concurrency)
+        self._work = queue.Queue(maxsize=self.concurrency)
+        self._threads = []
+
+    def _start(self):
+        # Browsers start with the first item, so a scan with nothing to apply to launches none
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"page-pool-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _worker(self, worker_id):
+        try:
+            with worker_context(self.storage_state, self.phase) as context:
+                while True:
+                    item = self._work.get()
+                    if item is self._STOP:
+                        return
+                    page = None
+                    try:
+                        page = context.new_page()
+                        page.set_default_timeout(self.timeout_ms)
+                        page.set_default_navigation_timeout(self.timeout_ms)
+                        self.handler(page, item)
+                    except Exception as e:
+                        print(f"[worker {worker_id}] Error: {e}")
+                    finally:
+                        if page:
+                            try:
+                                page.close()
+                            except Exception:
+                                pass
+        except Exception as e:
+            print(f"[worker {worker_id}] Could not start browser: {e}")
+
+    def _alive(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def _put(self, item):
+        # A full queue only waits while some worker is still alive to drain it
+        while self._alive():
+            try:
+                self._work.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def submit(self, item):
+        """Queues an item. Returns False if no worker is left to take it."""
+        self._start()
+        if self._put(item):
+            return True
+        print("WARNING: No browser worker is running.")
+        return False
+
+    def close(self):
+        """Waits for every queued item to finish, then shuts the workers down."""
+        for _ in self._threads:
+            self._put(self._STOP)
+        for t in self._threads:
+            t.join()